@@ -3,11 +3,21 @@
 import os
 import warnings
 
-from . import env, heroku, docker
+from . import env, fileconfig, providers
+# importing registers the providers
+from . import heroku, docker  # noqa
+from .dirconfig import ConfigDirWatcher, read_config_dir
+from .frozen import schedule_freeze
+from .layered import (LayeredConfig, envvar_layer, file_layer, object_layer,
+                      provider_layer)
 from .util import try_import
 
 
 class AppConfig(object):
+    # names of registered providers (see ``providers.provider``) applied
+    # after all other configuration has been loaded
+    providers = ()
+
     def __init__(self, app=None, *args, **kwargs):
         if app:
             self.init_app(app, *args, **kwargs)
@@ -19,17 +29,28 @@ class AppConfig(object):
                  default_settings=True,
                  from_envvars='json',
                  from_envvars_prefix=None,
-                 enable_cli=True):
+                 enable_cli=True,
+                 layered=False,
+                 freeze=False,
+                 config_dirs=(),
+                 watch_config_dirs=None):
 
         if from_envvars_prefix is None:
             from_envvars_prefix = app.name.upper().replace('.', '_') + '_'
 
+        # in layered mode, every source becomes a layer that is shared with
+        # all other apps loading the same source
+        if layered:
+            app.config = LayeredConfig.from_app(app)
+
         if default_settings is True:
-            defs = try_import(app.name + '.default_config')
-            if defs:
-                app.config.from_object(defs)
-        elif default_settings:
-            app.config.from_object(default_settings)
+            default_settings = try_import(app.name + '.default_config')
+
+        if default_settings:
+            if layered:
+                app.config.push_layer(object_layer(default_settings))
+            else:
+                app.config.from_object(default_settings)
 
         # load supplied configuration file
         if configfile is not None:
@@ -45,18 +66,57 @@ class AppConfig(object):
             envvar = app.name.upper() + '_CONFIG'
 
         if envvar and envvar in os.environ:
-            app.config.from_envvar(envvar)
+            # JSON, TOML and YAML files are parsed (and cached), everything
+            # else is executed as python code
+            filename = os.path.join(app.root_path, os.environ[envvar])
+            if layered:
+                app.config.push_layer(file_layer(filename))
+            elif not fileconfig.from_config_file(app.config, filename):
+                app.config.from_envvar(envvar)
+
+        # collect environment variables for the prefix and all providers in
+        # a single pass
+        provs = [providers.providers[name] for name in self.providers]
+        scan = providers.scan_environ(
+            provs, from_envvars_prefix if from_envvars else None)
 
         # load environment variables
         if from_envvars:
-            env.from_envvars(app.config,
-                             from_envvars_prefix,
-                             as_json=('json' == from_envvars))
+            if layered:
+                app.config.push_layer(envvar_layer(from_envvars_prefix,
+                                                   as_json=('json' ==
+                                                            from_envvars),
+                                                   environ=scan.prefixed))
+            else:
+                env.from_envvars(app.config,
+                                 from_envvars_prefix,
+                                 as_json=('json' == from_envvars),
+                                 environ=scan.prefixed)
+
+        for prov in provs:
+            if layered:
+                app.config.push_layer(provider_layer(prov, app.config,
+                                                     scan.matched[prov.name]))
+            else:
+                prov.func(app.config, scan.matched[prov.name])
+
+        # load configuration directories (e.g. docker secrets), optionally
+        # applying changes every watch_config_dirs seconds
+        for path in config_dirs:
+            app.config.update(read_config_dir(path))
+
+        if watch_config_dirs:
+            ConfigDirWatcher(app, config_dirs, watch_config_dirs)
 
         # register extension
         app.extensions = getattr(app, 'extensions', {})
         app.extensions['appconfig'] = self
 
+        # other extensions may still change the configuration, freeze it
+        # once the app is done setting up
+        if freeze:
+            schedule_freeze(app, freeze)
+
         # register command-line functions if available
         if enable_cli:
             cli_mod = try_import('flask_cli', 'flask.cli')
@@ -77,14 +137,8 @@ class AppConfig(object):
 
 
 class HerokuConfig(AppConfig):
-    def init_app(self, app, *args, **kwargs):
-        super(HerokuConfig, self).init_app(app, *args, **kwargs)
-
-        heroku.from_heroku_envvars(app.config)
+    providers = ('heroku', )
 
 
 class DockerConfig(AppConfig):
-    def init_app(self, app, *args, **kwargs):
-        super(DockerConfig, self).init_app(app, *args, **kwargs)
-
-        docker.from_docker_envvars(app.config)
+    providers = ('docker', )
@@ -7,10 +7,14 @@ import time
 import click
 from flask import current_app
 
-from . import server_backends
+from . import forkserver, pool, server_backends
 from .middleware import ReverseProxied
 from .signals import (db_before_reset, db_reset_dropped, db_reset_created,
-                      db_after_reset)
+                      db_reset_restored, db_after_reset, db_before_load,
+                      db_batch_loaded, db_after_load)
+from .fixtures import load_rows, read_fixture, sort_fixtures
+from .frozen import freeze_pending
+from .snapshot import get_snapshot, metadata_hash
 from .util import try_import_obj
 
 ENV_DEFAULT = '.env'
@@ -50,10 +54,20 @@ def register_cli(cli):
         help='Seconds before restarting the app if a non-recoverable '
         'exception occured (e.g. SyntaxError). Set this to 0 '
         'to disable (default: 2.0)')
-    def dev(host, port, ssl, gen_secret_key, flask_debug, extended_reload):
+    @click.option('--fork-server/--no-fork-server',
+                  default=False,
+                  help='Restart the app by forking a long-lived parent that '
+                  'keeps third-party packages imported, instead of starting '
+                  'a new interpreter. Only available on POSIX systems.')
+    def dev(host, port, ssl, gen_secret_key, flask_debug, extended_reload,
+            fork_server):
         # FIXME: support all options of ``flask run``
         app = current_app
 
+        latency = forkserver.restart_latency()
+        if latency is not None:
+            click.echo(' * Restarted in {:.3f} seconds'.format(latency))
+
         if not app.debug:
             click.echo(' * app.debug = True')
             app.debug = True  # conveniently force debug mode
@@ -73,6 +87,7 @@ def register_cli(cli):
         if flask_debug is None:
             flask_debug = app.debug
 
+        Debug = DebugToolbarExtension = None
         if flask_debug:
             Debug = try_import_obj('flask_debug', 'Debug')
             DebugToolbarExtension = try_import_obj('flask_debugtoolbar',
@@ -108,6 +123,16 @@ def register_cli(cli):
         if msgs:
             click.echo(' * {}'.format(', '.join(msgs)))
 
+        if fork_server and not hasattr(os, 'fork'):
+            click.secho('Fork server is not supported on this platform.',
+                        fg='yellow',
+                        err=True)
+            fork_server = False
+
+        if fork_server:
+            from werkzeug._reloader import ReloaderLoop
+            ReloaderLoop.restart_with_reloader = forkserver.restart_with_fork
+
         if extended_reload > 0:
             # we need to moneypatch the werkzeug reloader for this feature
             from werkzeug._reloader import ReloaderLoop
@@ -130,6 +155,8 @@ def register_cli(cli):
 
             ReloaderLoop.restart_with_reloader = _mp_restart
 
+        # Flask >= 2.2 ignores app.run() inside of CLI commands
+        os.environ.pop('FLASK_RUN_FROM_CLI', None)
         app.run(host, port, ssl_context=ssl, extra_files=extra_files)
 
     @cli.command(help='Runs a production server.')
@@ -148,6 +175,23 @@ def register_cli(cli):
                   default=1,
                   help='When possible, run this many instances in separate '
                   'processes. 0 means determine automatically. Default: 1')
+    @click.option('--threads',
+                  '-t',
+                  type=int,
+                  default=1,
+                  help='Number of threads per process, if supported by the '
+                  'backend. Default: 1')
+    @click.option('--db-budget',
+                  type=int,
+                  default=None,
+                  help='Maximum number of database connections of all '
+                  'processes combined. Overrides '
+                  'SQLALCHEMY_CONNECTION_BUDGET')
+    @click.option('--redis-budget',
+                  type=int,
+                  default=None,
+                  help='Maximum number of redis connections of all processes '
+                  'combined. Overrides REDIS_CONNECTION_BUDGET')
     @click.option('--backends',
                   '-b',
                   default=server_backends.DEFAULT,
@@ -165,7 +209,8 @@ def register_cli(cli):
         help='Enable HTTP-reverse proxy middleware. Do not activate '
         'this unless you need it, it becomes a security risks when used '
         'incorrectly.')
-    def serve(host, port, processes, backends, list_only, reverse_proxied):
+    def serve(host, port, processes, threads, db_budget, redis_budget,
+              backends, list_only, reverse_proxied):
         if processes <= 0:
             processes = None
 
@@ -173,7 +218,7 @@ def register_cli(cli):
                     'own risk',
                     fg='yellow',
                     err=True)
-        app = current_app
+        app = current_app._get_current_object()
 
         # we NEVER allow debug mode in production
         app.debug = False
@@ -218,17 +263,38 @@ def register_cli(cli):
             if not info:
                 continue
 
-            b = bnd(processes)
+            b = bnd(processes, threads)
+
+            try:
+                plans = pool.plan_pools(app.config,
+                                        b.processes,
+                                        b.threads,
+                                        budgets={'database': db_budget,
+                                                 'redis': redis_budget})
+            except ValueError as e:
+                click.secho(str(e), fg='red', err=True)
+                sys.exit(1)
+            pool.apply_pool_plan(app.config, plans)
+            pool.resize_engine_pools(app, plans)
 
             rcfg = OrderedDict()
             rcfg['app'] = app.name
             rcfg['# processes'] = str(b.processes)
+            rcfg['# threads'] = str(b.threads)
             rcfg['backend'] = str(b)
             rcfg['addr'] = '{}:{}'.format(host, port)
 
+            for plan in plans:
+                rcfg['{} pool'.format(plan.service)] = (
+                    '{p.size} + {p.overflow} overflow per process '
+                    '(budget {p.budget})'.format(p=plan))
+
             for k, v in rcfg.items():
                 click.echo('{:15s}: {}'.format(k, v))
 
+            # freeze before forking workers, so they all share the same pages
+            freeze_pending(app, freeze_gc=True)
+
             try:
                 b.run_server(wsgi_app, host, port)
                 sys.exit(0)  # if the server exits normally, just quit
@@ -277,9 +343,25 @@ def register_db_cli(cli, cli_mod):
             current_app.config['SQLALCHEMY_ECHO'] = echo
 
     @db.command(help='Drop and recreated schema')
-    def reset():
-        app = current_app
-        db = current_app.extensions['sqlalchemy'].db
+    @click.option('--snapshot/--no-snapshot',
+                  default=False,
+                  help='Restore schema and data from a snapshot instead of '
+                  'recreating it. The snapshot is captured on the first run, '
+                  'after db-reset-created has been sent, and recaptured '
+                  'whenever the models change.')
+    def reset(snapshot):
+        app = current_app._get_current_object()
+        db = _get_db()
+
+        snap = None
+        if snapshot:
+            try:
+                snap = get_snapshot(db.engine,
+                                    metadata_hash(db.metadata,
+                                                  db.engine.dialect))
+            except RuntimeError as e:
+                click.secho(str(e), fg='red', err=True)
+                sys.exit(1)
 
         # FIXME: this should be in a transaction, but flask-sqlalchemy
         # currently makes it hard to get it right.
@@ -288,10 +370,80 @@ def register_db_cli(cli, cli_mod):
         # by drop_all and create_all, causing deadlocks to occur
         db_before_reset.send(app, db=db, con=db.engine)
 
-        db.drop_all()
-        db_reset_dropped.send(app, db=db, con=db.engine)
+        if snap is not None and snap.exists():
+            db.session.remove()
+            snap.restore()
+            db_reset_restored.send(app, db=db, con=db.engine)
+        else:
+            db.drop_all()
+            db_reset_dropped.send(app, db=db, con=db.engine)
+
+            db.create_all()
+            db_reset_created.send(app, db=db, con=db.engine)
 
-        db.create_all()
-        db_reset_created.send(app, db=db, con=db.engine)
+            if snap is not None:
+                db.session.remove()
+                snap.capture()
+                click.echo('Captured snapshot {}'.format(snap))
 
         db_after_reset.send(app, db=db, con=db.engine)
+
+    @db.command(help='Load fixtures (JSON, JSON lines or CSV) into the '
+                'tables named like the files')
+    @click.argument('fixtures',
+                    nargs=-1,
+                    type=click.Path(exists=True, dir_okay=False))
+    @click.option('--batch-size',
+                  '-n',
+                  type=click.IntRange(1),
+                  default=1000,
+                  help='Number of rows inserted per statement. Default: 1000')
+    def load(fixtures, batch_size):
+        app = current_app._get_current_object()
+        db = _get_db()
+
+        try:
+            tables = sort_fixtures(db.metadata, fixtures)
+        except ValueError as e:
+            click.secho(str(e), fg='red', err=True)
+            sys.exit(1)
+
+        try:
+            with db.engine.begin() as con:
+                for path, table in tables:
+                    db_before_load.send(app, db=db, con=con, table=table)
+
+                    start = time.time()
+                    total = 0
+                    for count in load_rows(con, table,
+                                           read_fixture(path, table),
+                                           batch_size):
+                        total += count
+                        db_batch_loaded.send(app,
+                                             db=db,
+                                             con=con,
+                                             table=table,
+                                             rows=count)
+
+                        elapsed = time.time() - start
+                        click.echo(
+                            '\r{:20s} {:10d} rows {:10.0f} rows/sec'.format(
+                                table.name, total,
+                                total / elapsed if elapsed else 0),
+                            nl=False)
+                    click.echo()
+
+                    db_after_load.send(app, db=db, con=con, table=table,
+                                       rows=total)
+        except ValueError as e:
+            # invalid fixture contents, nothing has been committed
+            click.echo()
+            click.secho(str(e), fg='red', err=True)
+            sys.exit(1)
+
+
+def _get_db():
+    # Flask-SQLAlchemy < 3 registers a state object, newer versions the
+    # extension itself
+    ext = current_app.extensions['sqlalchemy']
+    return getattr(ext, 'db', ext)
@@ -0,0 +1,169 @@
+import io
+import json
+import os
+import threading
+import time
+
+from .frozen import FrozenConfig
+from .signals import config_dir_reloaded
+from .util import try_import
+
+# directories with at least this many files are read using a thread pool
+CONCURRENT_THRESHOLD = 64
+
+# file contents by path. each entry holds the (inode, mtime, size) of the
+# file when it was read and its contents
+_cache = {}
+
+
+def _stamp(st):
+    return (st.st_ino, getattr(st, 'st_mtime_ns', st.st_mtime), st.st_size)
+
+
+def _read_file(path):
+    # stat follows symlinks, so atomically swapped kubernetes volumes change
+    # the inode of every file
+    stamp = _stamp(os.stat(path))
+
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with io.open(path, 'rb') as f:
+        value = f.read()
+
+    # binary files (e.g. keystores) are kept as they are
+    try:
+        value = value.decode('utf8').rstrip('\r\n')
+    except UnicodeDecodeError:
+        pass
+
+    _cache[path] = (stamp, value)
+    return value
+
+
+def config_key(filename):
+    """Return the configuration key for a file, e.g. ``DB_PASSWORD`` for
+    ``db-password``."""
+    return filename.upper().replace('-', '_').replace('.', '_')
+
+
+def read_config_dir(path, as_json=False, concurrent=None):
+    """Read all files in a directory, e.g. docker secrets in
+    ``/run/secrets`` or a mounted kubernetes ``ConfigMap``. Hidden files and
+    subdirectories (like kubernetes' ``..data``) are skipped.
+
+    :param path: The directory to read.
+    :param as_json: If ``True``, values are parsed as JSON, falling back to
+                    the verbatim string if that fails.
+    :param concurrent: Read files using a thread pool. By default, this is
+                       done for directories with at least
+                       ``CONCURRENT_THRESHOLD`` files.
+    :return: A dictionary mapping configuration keys (see
+             :func:`config_key`) to values. Values are strings without
+             trailing newlines, or bytes for files that are not valid UTF-8.
+    """
+    files = [os.path.join(path, fn) for fn in sorted(os.listdir(path))
+             if not fn.startswith('.')]
+    files = [fn for fn in files if os.path.isfile(fn)]
+
+    if concurrent is None:
+        concurrent = len(files) >= CONCURRENT_THRESHOLD
+
+    # a pool needs at least one worker
+    futures = None
+    if concurrent and files:
+        futures = try_import('concurrent.futures')
+    if futures:
+        with futures.ThreadPoolExecutor(min(32, len(files))) as pool:
+            values = list(pool.map(_read_file, files))
+    else:
+        values = [_read_file(fn) for fn in files]
+
+    conf = {}
+    for fn, value in zip(files, values):
+        if as_json and not isinstance(value, bytes):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        conf[config_key(os.path.basename(fn))] = value
+    return conf
+
+
+def _update_config(app, values, removed):
+    if isinstance(app.config, FrozenConfig):
+        app.config = app.config.updated(values, removed)
+    else:
+        app.config.update(values)
+        for key in removed:
+            app.config.pop(key, None)
+
+
+class ConfigDirWatcher(object):
+    """Periodically checks configuration directories for changes and applies
+    them to the configuration of an app, sending
+    :data:`~flask_appconfig.signals.config_dir_reloaded` for each changed
+    directory. Keys of deleted files are removed from the configuration.
+
+    Checking is done in a background thread, which is started by the first
+    request of each process, as threads do not survive forking.
+
+    :param app: The app to update.
+    :param paths: The directories to watch.
+    :param interval: Seconds between two checks.
+    :param as_json: See :func:`read_config_dir`.
+    """
+
+    def __init__(self, app, paths, interval=5, as_json=False):
+        self.app = app
+        self.paths = list(paths)
+        self.interval = interval
+        self.as_json = as_json
+        self.values = {}
+        self.pid = None
+        self._lock = threading.Lock()
+
+        for path in self.paths:
+            self.values[path] = read_config_dir(path, as_json)
+
+        app.extensions['appconfig_dir_watcher'] = self
+        app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        if self.pid == os.getpid():
+            return
+
+        # concurrent first requests must not start multiple threads
+        with self._lock:
+            if self.pid != os.getpid():
+                t = threading.Thread(target=self._run)
+                t.daemon = True
+                t.start()
+                self.pid = os.getpid()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception:
+                self.app.logger.exception('Failed reloading configuration '
+                                          'directories')
+
+    def check(self):
+        """Check all directories once, applying any changed values."""
+        for path in self.paths:
+            values = read_config_dir(path, self.as_json)
+            old = self.values[path]
+            changed = {k: v for k, v in values.items()
+                       if k not in old or old[k] != v}
+            removed = set(old) - set(values)
+            self.values[path] = values
+
+            if changed or removed:
+                _update_config(self.app, changed, removed)
+                config_dir_reloaded.send(self.app,
+                                         path=path,
+                                         changed=changed,
+                                         removed=removed)
@@ -1,13 +1,21 @@
 #!/usr/bin/env python
 
 import os
-from six.moves.urllib_parse import urlparse
 
+from .providers import provider
+from .util import parse_url
+
+
+@provider('docker',
+          names=['PG_PORT', 'PG_ENV_POSTGRES_USER', 'PG_ENV_POSTGRES_PASSWORD',
+                 'PG_ENV_POSTGRES_DB', 'REDIS_PORT'])
+def from_docker_envvars(config, environ=None):
+    if environ is None:
+        environ = os.environ
 
-def from_docker_envvars(config):
     # linked postgres database (link name 'pg' or 'postgres')
-    if 'PG_PORT' in os.environ:
-        pg_url = urlparse(os.environ['PG_PORT'])
+    if 'PG_PORT' in environ:
+        pg_url = parse_url(environ['PG_PORT'])
 
         if not pg_url.scheme == 'tcp':
             raise ValueError('Only tcp scheme supported for postgres')
@@ -15,16 +23,16 @@ def from_docker_envvars(config):
         host, port = pg_url.netloc.split(':')
 
         uri = 'postgres://{user}:{password}@{host}:{port}/{database}'.format(
-            user=os.environ.get('PG_ENV_POSTGRES_USER', 'postgres'),
-            password=os.environ.get('PG_ENV_POSTGRES_PASSWORD', ''),
+            user=environ.get('PG_ENV_POSTGRES_USER', 'postgres'),
+            password=environ.get('PG_ENV_POSTGRES_PASSWORD', ''),
             host=host,
             port=port,
-            database=os.environ.get('PG_ENV_POSTGRES_DB', 'postgres'))
+            database=environ.get('PG_ENV_POSTGRES_DB', 'postgres'))
 
         config['SQLALCHEMY_DATABASE_URI'] = uri
 
-    if 'REDIS_PORT' in os.environ:
-        redis_url = urlparse(os.environ['REDIS_PORT'])
+    if 'REDIS_PORT' in environ:
+        redis_url = parse_url(environ['REDIS_PORT'])
 
         if not redis_url.scheme == 'tcp':
             raise ValueError('Only tcp scheme supported for redis')
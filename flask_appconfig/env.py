@@ -4,7 +4,7 @@ import json
 import os
 
 
-def from_envvars(conf, prefix=None, envvars=None, as_json=True):
+def from_envvars(conf, prefix=None, envvars=None, as_json=True, environ=None):
     """Load environment variables as Flask configuration settings.
 
     Values are parsed as JSON. If parsing fails with a ValueError,
@@ -19,29 +19,34 @@ def from_envvars(conf, prefix=None, envvars=None, as_json=True):
                     instead, names are mapped 1:1. If ``None``, see prefix
                     argument.
     :param as_json: If False, values will not be parsed as JSON first.
+    :param environ: The environment to read from. Defaults to
+                    ``os.environ``.
     """
     if prefix is None and envvars is None:
         raise RuntimeError('Must either give prefix or envvars argument')
 
+    if environ is None:
+        environ = os.environ
+
     # if it's a list, convert to dict
     if isinstance(envvars, list):
         envvars = {k: None for k in envvars}
 
     if not envvars:
-        envvars = {k: k[len(prefix):] for k in os.environ.keys()
+        envvars = {k: k[len(prefix):] for k in environ.keys()
                    if k.startswith(prefix)}
 
     for env_name, name in envvars.items():
         if name is None:
             name = env_name
 
-        if not env_name in os.environ:
+        if not env_name in environ:
             continue
 
         if as_json:
             try:
-                conf[name] = json.loads(os.environ[env_name])
+                conf[name] = json.loads(environ[env_name])
             except ValueError:
-                conf[name] = os.environ[env_name]
+                conf[name] = environ[env_name]
         else:
-            conf[name] = os.environ[env_name]
+            conf[name] = environ[env_name]
@@ -0,0 +1,99 @@
+import io
+import json
+import os
+
+import six
+
+from .util import freeze, thaw, try_import
+
+# parsed configuration files, by path. each entry holds the (mtime, size) of
+# the file when it was parsed and a tuple of all uppercase items, with values
+# frozen so that they can be shared
+_cache = {}
+
+
+def _load_json(f):
+    return json.load(f)
+
+
+def _load_toml(f):
+    mod = try_import('tomllib', 'tomli', 'toml')
+    if mod is None:
+        raise RuntimeError('Loading TOML configuration files requires tomli '
+                           'or toml to be installed')
+    if mod.__name__ == 'toml':
+        return mod.loads(f.read().decode('utf8'))
+    return mod.load(f)
+
+
+def _load_yaml(f):
+    mod = try_import('yaml')
+    if mod is None:
+        raise RuntimeError('Loading YAML configuration files requires PyYAML '
+                           'to be installed')
+    return mod.safe_load(f)
+
+
+loaders = {
+    '.json': _load_json,
+    '.toml': _load_toml,
+    '.yaml': _load_yaml,
+    '.yml': _load_yaml,
+}
+
+
+def parse_config_file(filename):
+    """Parse a JSON, TOML or YAML configuration file, returning a tuple of
+    all items with uppercase keys.
+
+    Results are cached for each file until its modification time or size
+    changes. Values are immutable (see :func:`~flask_appconfig.util.freeze`)
+    as they are shared by all callers.
+
+    :return: A tuple of ``(key, value)`` pairs or ``None``, if the file type
+             is not supported.
+    """
+    loader = loaders.get(os.path.splitext(filename)[1].lower())
+    if loader is None:
+        return None
+
+    path = os.path.abspath(filename)
+    st = os.stat(path)
+    stamp = (getattr(st, 'st_mtime_ns', st.st_mtime), st.st_size)
+
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with io.open(path, 'rb') as f:
+        data = loader(f) or {}
+
+    if not isinstance(data, dict):
+        raise ValueError('Configuration file {} does not contain a mapping'
+                         .format(filename))
+
+    # YAML allows keys of any type
+    items = tuple((k, freeze(v)) for k, v in data.items()
+                  if isinstance(k, six.string_types) and k.isupper())
+    _cache[path] = (stamp, items)
+    return items
+
+
+def from_config_file(config, filename):
+    """Load a JSON, TOML or YAML configuration file into ``config``, without
+    executing it. Only uppercase keys are loaded, just like
+    ``Config.from_pyfile`` does. Each configuration gets its own copy of
+    lists and dictionaries.
+
+    :param config: The configuration to update.
+    :param filename: Path to the configuration file. The file type is
+                     determined by its extension.
+    :return: ``True`` if the file was loaded, ``False`` if its type is not
+             supported.
+    """
+    items = parse_config_file(filename)
+    if items is None:
+        return False
+
+    config.update((k, thaw(v)) for k, v in items)
+    return True
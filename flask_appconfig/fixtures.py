@@ -0,0 +1,197 @@
+import csv
+import datetime
+import decimal
+import io
+import json
+import os
+from itertools import islice
+
+import six
+
+FORMATS = {
+    '.jsonl': 'jsonl',
+    '.json': 'json',
+    '.csv': 'csv',
+}
+
+
+def _bool(value):
+    lower = value.lower()
+    if lower in ('1', 't', 'true', 'y', 'yes', 'on'):
+        return True
+    if lower in ('0', 'f', 'false', 'n', 'no', 'off'):
+        return False
+    raise ValueError('Invalid boolean: {!r}'.format(value))
+
+
+def _strptime(value, formats):
+    for fmt in formats:
+        try:
+            return datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise ValueError('Invalid date or time: {!r}'.format(value))
+
+
+def _datetime(value):
+    return _strptime(value.replace('T', ' '), ('%Y-%m-%d %H:%M:%S.%f',
+                                               '%Y-%m-%d %H:%M:%S',
+                                               '%Y-%m-%d %H:%M',
+                                               '%Y-%m-%d'))
+
+
+def _date(value):
+    return _strptime(value, ('%Y-%m-%d', )).date()
+
+
+def _time(value):
+    return _strptime(value, ('%H:%M:%S.%f', '%H:%M:%S', '%H:%M')).time()
+
+
+# checked by identity, as datetime is a subclass of date
+_converters = {
+    bool: _bool,
+    int: int,
+    float: float,
+    decimal.Decimal: decimal.Decimal,
+    datetime.datetime: _datetime,
+    datetime.date: _date,
+    datetime.time: _time,
+}
+
+
+def _column_converters(table):
+    converters = {}
+    for col in table.columns:
+        try:
+            python_type = col.type.python_type
+        except NotImplementedError:
+            continue
+
+        if python_type in _converters:
+            converters[col.name] = _converters[python_type]
+    return converters
+
+
+def _normalized(rows, columns, table):
+    # executemany() requires all rows to have the same keys, missing values
+    # are inserted as NULL. JSON has no types for dates or decimals, string
+    # values are converted like CSV values
+    converters = {k: conv for k, conv in _column_converters(table).items()
+                  if k in columns}
+
+    for row in rows:
+        if len(row) != len(columns):
+            row = {k: row.get(k) for k in columns}
+        for k, conv in converters.items():
+            if isinstance(row[k], six.string_types):
+                row[k] = conv(row[k])
+        yield row
+
+
+def _json_lines(f):
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def read_json_lines(f, table):
+    # the columns used by any row are determined in a first pass, to avoid
+    # keeping the whole file in memory
+    columns = set()
+    for row in _json_lines(f):
+        columns.update(row)
+
+    f.seek(0)
+    return _normalized(_json_lines(f), columns, table)
+
+
+def read_json(f, table):
+    rows = json.load(f)
+    if not isinstance(rows, list):
+        raise ValueError('JSON fixture must contain an array of objects')
+
+    columns = set()
+    for row in rows:
+        columns.update(row)
+    return _normalized(rows, columns, table)
+
+
+def read_csv(f, table):
+    converters = _column_converters(table)
+
+    for row in csv.DictReader(f):
+        for k, v in row.items():
+            if v == '':
+                row[k] = None
+            elif k in converters:
+                row[k] = converters[k](v)
+        yield row
+
+
+readers = {
+    'jsonl': read_json_lines,
+    'json': read_json,
+    'csv': read_csv,
+}
+
+
+def fixture_table(metadata, path):
+    """Return the table a fixture file is loaded into. The table is
+    determined by the filename without extension, i.e. ``users.csv`` is
+    loaded into the ``users`` table.
+
+    :raise ValueError: If the file type is not supported or there is no
+                       matching table.
+    """
+    name, ext = os.path.splitext(os.path.basename(path))
+
+    if ext not in FORMATS:
+        raise ValueError('Unsupported fixture type: {}'.format(path))
+
+    if name not in metadata.tables:
+        raise ValueError('No table named {!r} found for fixture {}'.format(
+            name, path))
+    return metadata.tables[name]
+
+
+def sort_fixtures(metadata, paths):
+    """Sort fixture files so that tables are loaded before any table that
+    references them through a foreign key.
+
+    :return: A list of ``(path, table)`` tuples.
+    """
+    order = {t.name: i for i, t in enumerate(metadata.sorted_tables)}
+    fixtures = [(path, fixture_table(metadata, path)) for path in paths]
+    return sorted(fixtures, key=lambda f: order[f[1].name])
+
+
+def read_fixture(path, table):
+    """Iterate over the rows of a fixture file. Rows are dictionaries
+    mapping column names to values."""
+    fmt = FORMATS[os.path.splitext(path)[1]]
+    with io.open(path, newline='', encoding='utf8') as f:
+        for row in readers[fmt](f, table):
+            yield row
+
+
+def iter_batches(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def load_rows(con, table, rows, batch_size=1000):
+    """Insert ``rows`` into ``table`` in batches of ``batch_size`` rows,
+    using a single ``executemany`` per batch.
+
+    :return: A generator yielding the size of each inserted batch.
+    """
+    stmt = table.insert()
+    for batch in iter_batches(rows, batch_size):
+        con.execute(stmt, batch)
+        yield len(batch)
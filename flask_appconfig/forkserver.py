@@ -0,0 +1,143 @@
+import os
+import runpy
+import site
+import sys
+import sysconfig
+import time
+import traceback
+
+import click
+
+# set by the parent right before a restart, read by the child once it is ready
+RESTART_TIME_ENVVAR = 'FLASK_APPCONFIG_RESTART_TIME'
+
+
+def _library_paths():
+    candidates = []
+
+    # the current environment and, for virtual environments, the base
+    # installation it was created from (its standard library and, with
+    # --system-site-packages, its site-packages)
+    base = getattr(sys, 'base_prefix', sys.prefix)
+    for scheme_vars in (None, {'base': base, 'platbase': base}):
+        paths = sysconfig.get_paths(vars=scheme_vars)
+        candidates.extend(paths.get(name) for name in ('stdlib', 'platstdlib',
+                                                       'purelib', 'platlib'))
+
+    # site-packages directories of the distribution (e.g. debian's
+    # dist-packages) and the user site (pip install --user)
+    if hasattr(site, 'getsitepackages'):
+        candidates.extend(site.getsitepackages())
+    if hasattr(site, 'getusersitepackages'):
+        candidates.append(site.getusersitepackages())
+
+    return tuple(set(os.path.realpath(path) for path in candidates if path))
+
+
+def is_project_module(mod, library_paths=None):
+    """Check whether a module belongs to the project, i.e. it is neither
+    part of the standard library nor an installed third-party package.
+
+    :param mod: A module object.
+    :param library_paths: Tuple of directories considered library locations.
+                          Defaults to the paths reported by ``sysconfig``.
+    """
+    filename = getattr(mod, '__file__', None)
+    if not filename:
+        return False  # builtin, frozen or namespace packages
+
+    if library_paths is None:
+        library_paths = _library_paths()
+
+    filename = os.path.realpath(filename)
+    return not any(filename.startswith(path + os.sep)
+                   for path in library_paths)
+
+
+def purge_project_modules():
+    """Remove all project modules from ``sys.modules``, causing them to be
+    imported anew on next use. Third-party modules are kept loaded."""
+    library_paths = _library_paths()
+    for name, mod in list(sys.modules.items()):
+        if mod is None or name == '__main__':
+            continue
+        if is_project_module(mod, library_paths):
+            del sys.modules[name]
+
+
+def _main_target():
+    # like werkzeug's ``_get_args_for_reloading``: if started using
+    # ``python -m``, the module has to be run as such, otherwise relative
+    # imports in it fail
+    spec = getattr(sys.modules.get('__main__'), '__spec__', None)
+    name = getattr(spec, 'name', None)
+    if name:
+        if name.endswith('.__main__'):
+            name = name[:-len('.__main__')]
+        return 'module', name
+    return 'path', sys.argv[0]
+
+
+def _run_child():
+    os.environ['WERKZEUG_RUN_MAIN'] = 'true'
+    kind, target = _main_target()
+    purge_project_modules()
+
+    try:
+        if kind == 'module':
+            runpy.run_module(target, run_name='__main__', alter_sys=True)
+        else:
+            runpy.run_path(target, run_name='__main__')
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        click.echo(e.code, err=True)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def restart_with_fork(reloader):
+    """Replacement for werkzeug's ``ReloaderLoop.restart_with_reloader``.
+
+    Instead of spawning a new interpreter, the (long-lived) parent process
+    forks and the child re-runs the command line after dropping the project
+    modules. Third-party packages that the parent already imported are
+    shared with the child and do not need to be imported again.
+    """
+    while True:
+        click.echo(' * Restarting with fork server')
+        os.environ[RESTART_TIME_ENVVAR] = repr(time.time())
+
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                sys.stdout.flush()
+                exit_code = _run_child()
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(exit_code)
+
+        _, status = os.waitpid(pid, 0)
+        if os.WIFEXITED(status):
+            exit_code = os.WEXITSTATUS(status)
+        else:
+            exit_code = 1
+
+        if exit_code != 3:
+            return exit_code
+
+
+def restart_latency():
+    """Return the seconds elapsed since the last restart was triggered by
+    the reloader, or ``None`` if this process was not started by it."""
+    started = os.environ.get(RESTART_TIME_ENVVAR)
+    if started is None or os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        return None
+    return time.time() - float(started)
@@ -0,0 +1,114 @@
+import gc
+
+from flask import Config
+
+_missing = object()
+
+
+class FrozenConfig(Config):
+    """An immutable configuration. Reads are as fast as on a regular
+    configuration, any attempt to change a value raises a ``TypeError``.
+
+    Setting a key to the value it already holds is allowed, as Flask does
+    this in a few places (e.g. ``app.run(debug=False)``).
+
+    :param root_path: See ``flask.Config``.
+    :param data: The configuration values.
+    :param attrs: If ``True``, all uppercase keys are also accessible as
+                  attributes, e.g. ``config.REDIS_HOST``. Attributes are
+                  looked up in the configuration itself and always hold the
+                  same value as the item.
+    """
+
+    def __init__(self, root_path, data, attrs=False):
+        super(FrozenConfig, self).__init__(root_path, data)
+        self.attrs = attrs
+
+    def __getattr__(self, key):
+        # only called if regular attribute lookup fails
+        if self.__dict__.get('attrs') and key.isupper():
+            try:
+                return dict.__getitem__(self, key)
+            except KeyError:
+                pass
+        raise AttributeError(key)
+
+    @classmethod
+    def from_config(cls, config, attrs=False):
+        # build a new dictionary instead of copying the existing one, this
+        # also flattens layered configurations
+        return cls(config.root_path, dict(config.items()), attrs)
+
+    def updated(self, values, removed=()):
+        """Return a new frozen configuration with ``values`` changed and the
+        keys in ``removed`` deleted."""
+        data = dict(self)
+        data.update(values)
+        for key in removed:
+            data.pop(key, None)
+        return type(self)(self.root_path, data, self.attrs)
+
+    def __reduce__(self):
+        # copy and pickle would otherwise fill an empty instance through
+        # __setitem__
+        return type(self), (self.root_path, dict(self), self.attrs)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('Configuration is frozen and cannot be changed')
+
+    def __setitem__(self, key, value):
+        if dict.get(self, key, _missing) is not value:
+            self._immutable()
+
+    __delitem__ = _immutable
+    clear = _immutable
+    pop = _immutable
+    popitem = _immutable
+    setdefault = _immutable
+    update = _immutable
+    __ior__ = _immutable
+
+    def __setattr__(self, key, value):
+        if key.isupper():
+            self._immutable()
+        super(FrozenConfig, self).__setattr__(key, value)
+
+
+def freeze_config(app, attrs=False, freeze_gc=False):
+    """Replace the configuration of ``app`` with a ``FrozenConfig``. Does
+    nothing if it is already frozen.
+
+    :param attrs: See ``FrozenConfig``.
+    :param freeze_gc: If ``True`` and supported, all objects currently
+                      tracked by the garbage collector are moved to a
+                      permanent generation (see ``gc.freeze``), so that
+                      worker processes forked afterwards do not write to
+                      them during collections.
+    """
+    if not isinstance(app.config, FrozenConfig):
+        app.config = FrozenConfig.from_config(app.config, attrs)
+
+    if freeze_gc and hasattr(gc, 'freeze'):
+        gc.freeze()
+
+
+def schedule_freeze(app, mode):
+    """Freeze the configuration of ``app`` once it handles its first request
+    or when :func:`freeze_pending` is called, whatever comes first.
+
+    :param mode: ``True`` or ``'attrs'``, to enable attribute access.
+    """
+    app.extensions['appconfig_freeze'] = mode
+
+    @app.before_request
+    def _freeze():
+        if not isinstance(app.config, FrozenConfig):
+            freeze_pending(app)
+
+
+def freeze_pending(app, freeze_gc=False):
+    """Freeze the configuration of ``app`` if this has been requested
+    through :func:`schedule_freeze`."""
+    mode = app.extensions.get('appconfig_freeze')
+    if mode:
+        freeze_config(app, attrs=(mode == 'attrs'), freeze_gc=freeze_gc)
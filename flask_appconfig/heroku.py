@@ -3,32 +3,66 @@
 import os
 import re
 import warnings
-from six.moves.urllib_parse import urlparse
 
 from . import env
+from .providers import provider
+from .util import parse_url
 
 HEROKU_POSTGRES_ENV_NAME_RE = re.compile('HEROKU_POSTGRESQL_[A-Z_]*URL')
 
 
-def from_heroku_envvars(config):
-    var_map = {
-        # SQL-Alchemy
-        'DATABASE_URL': 'SQLALCHEMY_DATABASE_URI',
+# environment variables mapped to different configuration names
+VAR_MAP = {
+    # SQL-Alchemy
+    'DATABASE_URL': 'SQLALCHEMY_DATABASE_URI',
 
-        # Celery w/ RabbitMQ
-        'BROKER_URL': 'RABBITMQ_URL',
-        'REDISTOGO_URL': 'REDIS_URL',
-        'MONGOLAB_URI': 'MONGO_URI',
-        'MONGOHQ_URL': 'MONGO_URI',
-        'CLOUDANT_URL': 'COUCHDB_URL',
-        'MEMCACHIER_SERVERS': 'CACHE_MEMCACHED_SERVERS',
-        'MEMCACHIER_USERNAME': 'CACHE_MEMCACHED_USERNAME',
-        'MEMCACHIER_PASSWORD': 'CACHE_MEMCACHED_PASSWORD',
-    }
+    # Celery w/ RabbitMQ
+    'BROKER_URL': 'RABBITMQ_URL',
+    'REDISTOGO_URL': 'REDIS_URL',
+    'MONGOLAB_URI': 'MONGO_URI',
+    'MONGOHQ_URL': 'MONGO_URI',
+    'CLOUDANT_URL': 'COUCHDB_URL',
+    'MEMCACHIER_SERVERS': 'CACHE_MEMCACHED_SERVERS',
+    'MEMCACHIER_USERNAME': 'CACHE_MEMCACHED_USERNAME',
+    'MEMCACHIER_PASSWORD': 'CACHE_MEMCACHED_PASSWORD',
+}
+
+# environment variables imported as they are
+VAR_LIST = [
+    # Sentry
+    'SENTRY_DSN',
+
+    # Exceptional
+    'EXCEPTIONAL_API_KEY',
+
+    # Flask-GoogleFed
+    'GOOGLE_DOMAIN',
+
+    # Mailgun
+    'MAILGUN_API_KEY',
+    'MAILGUN_SMTP_LOGIN',
+    'MAILGUN_SMTP_PASSWORD',
+    'MAILGUN_SMTP_PORT',
+    'MAILGUN_SMTP_SERVER',
+
+    # SendGrid
+    'SENDGRID_USERNAME',
+    'SENDGRID_PASSWORD'
+]
+
+
+@provider('heroku',
+          names=list(VAR_MAP) + VAR_LIST,
+          patterns=[HEROKU_POSTGRES_ENV_NAME_RE])
+def from_heroku_envvars(config, environ=None):
+    if environ is None:
+        environ = os.environ
+
+    var_map = dict(VAR_MAP)
 
     # search postgresql config using regex
-    if 'DATABASE_URL' not in os.environ:
-        for k in os.environ.keys():
+    if 'DATABASE_URL' not in environ:
+        for k in environ.keys():
             if HEROKU_POSTGRES_ENV_NAME_RE.match(k):
                 var_map[k] = 'SQLALCHEMY_DATABASE_URI'
                 warnings.warn('Using {0} as the database URL. However, '
@@ -36,31 +70,9 @@ def from_heroku_envvars(config):
                               'to DATABASE_URL by running \'heroku pg:'
                               'promote {0}\''.format(k), RuntimeWarning)
 
-    var_list = [
-        # Sentry
-        'SENTRY_DSN',
-
-        # Exceptional
-        'EXCEPTIONAL_API_KEY',
-
-        # Flask-GoogleFed
-        'GOOGLE_DOMAIN',
-
-        # Mailgun
-        'MAILGUN_API_KEY',
-        'MAILGUN_SMTP_LOGIN',
-        'MAILGUN_SMTP_PASSWORD',
-        'MAILGUN_SMTP_PORT',
-        'MAILGUN_SMTP_SERVER',
-
-        # SendGrid
-        'SENDGRID_USERNAME',
-        'SENDGRID_PASSWORD'
-    ]
-
     # import the relevant envvars
-    env.from_envvars(config, envvars=var_list, as_json=False)
-    env.from_envvars(config, envvars=var_map, as_json=False)
+    env.from_envvars(config, envvars=VAR_LIST, as_json=False, environ=environ)
+    env.from_envvars(config, envvars=var_map, as_json=False, environ=environ)
 
     # fix up configuration
     if 'MAILGUN_SMTP_SERVER' in config:
@@ -88,14 +100,14 @@ def from_heroku_envvars(config):
 
     # for backwards compatiblity, redis:
     if 'REDIS_URL' in config:
-        url = urlparse(config['REDIS_URL'])
+        url = parse_url(config['REDIS_URL'])
         config['REDIS_HOST'] = url.hostname
         config['REDIS_PORT'] = url.port
         config['REDIS_PASSWORD'] = url.password
         # FIXME: missing db#?
 
     if 'MONGO_URI' in config:
-        url = urlparse(config['MONGO_URI'])
+        url = parse_url(config['MONGO_URI'])
         config['MONGODB_USER'] = url.username
         config['MONGODB_PASSWORD'] = url.password
         config['MONGODB_HOST'] = url.hostname
@@ -0,0 +1,335 @@
+import os
+
+from flask import Config
+
+from . import env, fileconfig
+from .util import freeze
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # python 2
+    from collections import Mapping
+
+# all shared layers of this process, see ``_cached_layer``
+_layers = {}
+
+# layers of parsed configuration files, by path. each entry holds the items
+# returned by ``fileconfig.parse_config_file`` and the layer created from them
+_file_layers = {}
+
+# provider layers, see ``provider_layer``. each entry holds the layer and the
+# keys the provider read while creating it
+_provider_layers = {}
+
+
+class Layer(Mapping):
+    """An immutable configuration layer. Layers compare by identity, as they
+    are used as parts of cache keys.
+
+    :param data: A dictionary holding the configuration values. It must not
+                 be modified afterwards; the values of shared layers must be
+                 immutable as well (see :func:`~flask_appconfig.util.freeze`).
+    :param shared: Whether the layer is shared between multiple apps.
+    """
+
+    def __init__(self, data, shared=False):
+        self._data = data
+        self.shared = shared
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        return self is other
+
+    def __ne__(self, other):
+        return self is not other
+
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return '<Layer {!r}>'.format(self._data)
+
+
+def _shared_layer(data):
+    # values are frozen, otherwise changing a list on one app would change
+    # it for all others
+    return Layer({k: freeze(v) for k, v in data.items()}, shared=True)
+
+
+def _cached_layer(key, create):
+    layer = _layers.get(key)
+    if layer is None:
+        layer = _layers[key] = _shared_layer(create())
+    return layer
+
+
+def object_layer(obj):
+    """Return a layer holding all uppercase attributes of ``obj``, see
+    ``Config.from_object``."""
+
+    def create():
+        conf = Config('')
+        conf.from_object(obj)
+        return dict(conf)
+
+    return _cached_layer(('object', obj), create)
+
+
+def file_layer(filename):
+    """Return a layer holding the contents of a configuration file. JSON, TOML
+    and YAML files are parsed, other files are executed as python code."""
+    items = fileconfig.parse_config_file(filename)
+    if items is not None:
+        path = os.path.abspath(filename)
+        cached = _file_layers.get(path)
+        if cached is None or cached[0] is not items:
+            # values are already frozen
+            cached = _file_layers[path] = (items, Layer(dict(items),
+                                                        shared=True))
+        return cached[1]
+
+    st = os.stat(filename)
+
+    def create():
+        conf = Config('')
+        conf.from_pyfile(filename)
+        return dict(conf)
+
+    return _cached_layer(('pyfile', os.path.abspath(filename), st.st_mtime,
+                          st.st_size), create)
+
+
+def envvar_layer(prefix, as_json=True, environ=None):
+    """Return a layer holding all environment variables starting with
+    ``prefix``, see :func:`~flask_appconfig.env.from_envvars`."""
+    if environ is None:
+        environ = os.environ
+    matched = frozenset((k, v) for k, v in environ.items()
+                        if k.startswith(prefix))
+
+    def create():
+        data = {}
+        env.from_envvars(data, prefix, as_json=as_json, environ=dict(matched))
+        return data
+
+    return _cached_layer(('env', prefix, as_json, matched), create)
+
+
+def provider_layer(prov, config, environ):
+    """Return a layer holding all values set by a provider (see
+    :mod:`~flask_appconfig.providers`).
+
+    The provider is run against all layers and the overlay of ``config``.
+    The resulting layer is shared with other apps as long as none of the
+    keys the provider read are set (or deleted) on a single app.
+
+    :param prov: A ``Provider`` instance.
+    :param config: The configuration the layer will be added to.
+    :param environ: The environment variables collected for the provider.
+    """
+    private = config.private_keys()
+    key = (prov.name, tuple(layer for layer in config.layers if layer.shared),
+           frozenset(environ.items()))
+
+    cached = _provider_layers.get(key)
+    if cached is not None and not cached[1] & private:
+        return cached[0]
+
+    overlay = Layer(dict(config.overlay_items()))
+    view = _TrackingConfig(config.root_path, config.layers + [overlay])
+    view._deleted = set(config._deleted)
+    prov.func(view, environ)
+
+    if view.read_keys is None or view.read_keys & private:
+        return Layer(dict(view.overlay_items()))
+
+    layer = _shared_layer(dict(view.overlay_items()))
+    _provider_layers[key] = (layer, frozenset(view.read_keys))
+    return layer
+
+
+class LayeredConfig(Config):
+    """A configuration that looks up values in a stack of immutable,
+    possibly shared layers. Values set on the configuration itself are kept
+    in a per-app overlay on top of all layers.
+
+    :param root_path: See ``flask.Config``.
+    :param layers: An iterable of layers, the last one taking precedence.
+    :param defaults: Initial contents of the overlay.
+    """
+
+    def __init__(self, root_path, layers=(), defaults=None):
+        super(LayeredConfig, self).__init__(root_path, defaults)
+        self.layers = list(layers)
+        self._deleted = set()
+
+    @classmethod
+    def from_app(cls, app):
+        """Create a layered configuration from the current configuration of
+        ``app``. Flask's default values are shared, everything that has been
+        changed becomes a layer of its own."""
+        base = app.default_config
+        changed = {k: v for k, v in app.config.items()
+                   if k not in base or base[k] is not v}
+
+        layers = [_cached_layer(('flask', id(base)), lambda: dict(base)),
+                  Layer(changed)]
+        return cls(app.config.root_path, layers)
+
+    def push_layer(self, layer):
+        """Add ``layer`` on top of all other layers, below the overlay."""
+        self.layers.append(layer)
+
+    def overlay_items(self):
+        """Return the values set on this configuration directly."""
+        return dict.items(self)
+
+    def private_keys(self):
+        """Return all keys set or deleted on this configuration only, i.e.
+        not coming from a shared layer."""
+        keys = set(dict.keys(self))
+        keys.update(self._deleted)
+        for layer in self.layers:
+            if not layer.shared:
+                keys.update(layer)
+        return keys
+
+    def __getitem__(self, key):
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        if key not in self._deleted:
+            for layer in reversed(self.layers):
+                if key in layer:
+                    return layer[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        self._deleted.discard(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if dict.__contains__(self, key):
+            dict.__delitem__(self, key)
+        self._deleted.add(key)
+
+    def keys(self):
+        keys = set()
+        for layer in self.layers:
+            keys.update(layer)
+        keys.difference_update(self._deleted)
+        keys.update(dict.keys(self))
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+    def copy(self):
+        return dict(self.items())
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *args):
+        try:
+            value = self[key]
+        except KeyError:
+            if args:
+                return args[0]
+            raise
+        del self[key]
+        return value
+
+    def update(self, *args, **kwargs):
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __or__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        rv = self.copy()
+        rv.update(other)
+        return rv
+
+    def __ror__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        rv = dict(other)
+        rv.update(self.items())
+        return rv
+
+    def popitem(self):
+        for key in self.keys():
+            return key, self.pop(key)
+        raise KeyError('popitem(): configuration is empty')
+
+    def clear(self):
+        self._deleted.update(self.keys())
+        dict.clear(self)
+
+    def __eq__(self, other):
+        return self.copy() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<{} {!r}>'.format(type(self).__name__, self.copy())
+
+
+class _TrackingConfig(LayeredConfig):
+    # records the keys read, read_keys is None if all of them were
+
+    def __init__(self, *args, **kwargs):
+        super(_TrackingConfig, self).__init__(*args, **kwargs)
+        self.read_keys = set()
+
+    def __getitem__(self, key):
+        if self.read_keys is not None:
+            self.read_keys.add(key)
+        return super(_TrackingConfig, self).__getitem__(key)
+
+    def keys(self):
+        self.read_keys = None
+        return super(_TrackingConfig, self).keys()
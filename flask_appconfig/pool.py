@@ -0,0 +1,129 @@
+from collections import namedtuple
+
+from .util import try_import
+
+PoolPlan = namedtuple('PoolPlan', 'service,budget,per_worker,size,overflow')
+
+# service name, configuration key holding the service address, budget key
+SERVICES = [
+    ('database', 'SQLALCHEMY_DATABASE_URI', 'SQLALCHEMY_CONNECTION_BUDGET'),
+    ('redis', 'REDIS_URL', 'REDIS_CONNECTION_BUDGET'),
+]
+
+
+def plan_pools(config, workers, threads=1, budgets=None):
+    """Divide the connection budget of each configured backing service among
+    all worker processes.
+
+    Every worker gets a pool large enough for each of its threads to hold a
+    connection; the remainder of its share of the budget is allowed as
+    overflow.
+
+    :param config: The app configuration. Budgets are read from
+                   ``SQLALCHEMY_CONNECTION_BUDGET`` and
+                   ``REDIS_CONNECTION_BUDGET``.
+    :param workers: Number of worker processes.
+    :param threads: Number of threads per worker process.
+    :param budgets: A dictionary of service names to budgets, overriding the
+                    configuration.
+    :return: A list of ``PoolPlan`` tuples, one for each service that is
+             configured and has a budget.
+    :raise ValueError: If a budget is too small for ``workers * threads``
+                       connections.
+    """
+    budgets = budgets or {}
+    plans = []
+
+    for service, url_key, budget_key in SERVICES:
+        budget = budgets.get(service) or config.get(budget_key)
+        if not budget or not config.get(url_key):
+            continue
+
+        budget = int(budget)
+        if budget < workers * threads:
+            raise ValueError(
+                'Connection budget for {} ({}) is too small for {} workers '
+                'with {} threads each'.format(service, budget, workers,
+                                              threads))
+
+        per_worker = budget // workers
+        plans.append(PoolPlan(service, budget, per_worker, threads,
+                              per_worker - threads))
+
+    return plans
+
+
+def apply_pool_plan(config, plans):
+    """Store the pool sizes of ``plans`` in the app configuration.
+
+    Sets ``SQLALCHEMY_POOL_SIZE``/``SQLALCHEMY_MAX_OVERFLOW`` (as well as the
+    corresponding ``SQLALCHEMY_ENGINE_OPTIONS``) and
+    ``REDIS_MAX_CONNECTIONS``.
+    """
+    for plan in plans:
+        if plan.service == 'database':
+            config['SQLALCHEMY_POOL_SIZE'] = plan.size
+            config['SQLALCHEMY_MAX_OVERFLOW'] = plan.overflow
+
+            opts = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+            opts['pool_size'] = plan.size
+            opts['max_overflow'] = plan.overflow
+            config['SQLALCHEMY_ENGINE_OPTIONS'] = opts
+        elif plan.service == 'redis':
+            config['REDIS_MAX_CONNECTIONS'] = plan.per_worker
+
+
+def _default_engine(app):
+    ext = app.extensions.get('sqlalchemy')
+    if ext is None:
+        return None
+
+    # Flask-SQLAlchemy >= 3 creates engines in init_app
+    engines = getattr(ext, '_app_engines', None)
+    if engines is not None:
+        return engines.get(app, {}).get(None)
+
+    # older versions create them on first use
+    connector = getattr(ext, 'connectors', {}).get(None)
+    return getattr(connector, '_engine', None)
+
+
+def _resized_pool(pool, size, overflow):
+    # same as QueuePool.recreate(), with a different size
+    return type(pool)(pool._creator,
+                      pool_size=size,
+                      max_overflow=overflow,
+                      timeout=pool._timeout,
+                      use_lifo=getattr(pool._pool, 'use_lifo', False),
+                      pre_ping=pool._pre_ping,
+                      recycle=pool._recycle,
+                      echo=pool.echo,
+                      logging_name=pool._orig_logging_name,
+                      reset_on_return=pool._reset_on_return,
+                      _dispatch=pool.dispatch,
+                      dialect=pool._dialect)
+
+
+def resize_engine_pools(app, plans):
+    """Apply the database plan in ``plans`` to an engine Flask-SQLAlchemy
+    has already created for ``app``, as changing the configuration
+    afterwards has no effect on it.
+
+    The connections of the old pool are closed and the engine gets a new
+    pool of the planned size. Engines not using a ``QueuePool`` (e.g. for
+    in-memory SQLite databases) are left alone.
+
+    :return: The resized engine or ``None``.
+    """
+    sa_pool = try_import('sqlalchemy.pool')
+    engine = _default_engine(app)
+    if sa_pool is None or engine is None:
+        return None
+
+    for plan in plans:
+        if (plan.service == 'database' and
+                isinstance(engine.pool, sa_pool.QueuePool)):
+            engine.dispose()
+            engine.pool = _resized_pool(engine.pool, plan.size,
+                                        plan.overflow)
+            return engine
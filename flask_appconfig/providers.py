@@ -0,0 +1,99 @@
+import os
+import re
+from collections import namedtuple
+
+import six
+
+Provider = namedtuple('Provider', 'name,func,names,patterns,prefixes')
+
+providers = {}
+
+
+def provider(name, names=(), patterns=(), prefixes=()):
+    """Register a function that maps environment variables to configuration
+    values.
+
+    The function is called with the configuration and a dictionary holding
+    only the environment variables it declared interest in: every variable
+    listed in ``names``, matching one of the regular expressions in
+    ``patterns`` or starting with one of ``prefixes``.
+    """
+
+    def _(func):
+        providers[name] = Provider(
+            name, func, frozenset(names),
+            tuple(re.compile(p) if isinstance(p, six.string_types) else p
+                  for p in patterns), tuple(prefixes))
+        return func
+
+    return _
+
+
+EnvScan = namedtuple('EnvScan', 'prefixed,matched')
+
+
+def scan_environ(provs, prefix=None, environ=None):
+    """Sort the environment into the variables each provider in ``provs``
+    is interested in, using a single pass over all variables.
+
+    :param provs: An iterable of ``Provider`` instances.
+    :param prefix: If not ``None``, all variables starting with this prefix
+                   are collected as well.
+    :param environ: The environment to scan. Defaults to ``os.environ``.
+    :return: An ``EnvScan`` tuple. ``prefixed`` is a dictionary holding all
+             variables starting with ``prefix``, ``matched`` maps provider
+             names to dictionaries of their variables.
+    """
+    if environ is None:
+        environ = os.environ
+
+    provs = list(provs)
+    matched = {p.name: {} for p in provs}
+    prefixed = {}
+
+    # dispatch table for exact names, everything else is checked only on
+    # variables starting with one of the prefixes or literal pattern prefixes
+    by_name = {}
+    for p in provs:
+        for name in p.names:
+            by_name.setdefault(name, []).append(matched[p.name])
+    patterns = [(pat, matched[p.name]) for p in provs for pat in p.patterns]
+    prefixes = [(pre, matched[p.name]) for p in provs for pre in p.prefixes]
+    if prefix is not None:
+        prefixes.append((prefix, prefixed))
+
+    leads = tuple(pre for pre, _ in prefixes) + tuple(
+        _literal_prefix(pat) for pat, _ in patterns)
+
+    # values are only read for matching variables; for os.environ, decoding
+    # them is the most expensive part of iterating over all variables
+    for k in environ:
+        for dest in by_name.get(k, ()):
+            dest[k] = environ[k]
+
+        if not k.startswith(leads):
+            continue
+
+        for pre, dest in prefixes:
+            if k.startswith(pre):
+                dest[k] = environ[k]
+
+        for pat, dest in patterns:
+            if pat.match(k):
+                dest[k] = environ[k]
+
+    return EnvScan(prefixed, matched)
+
+
+def _literal_prefix(pattern):
+    # the literal characters every match of pattern starts with. patterns
+    # using alternation or flags (e.g. re.I) are not analyzed and have none,
+    # so every variable is matched against them
+    if '|' in pattern.pattern or pattern.flags & ~re.UNICODE:
+        return ''
+
+    lead = re.match(r'[A-Za-z0-9_]*', pattern.pattern).group(0)
+    rest = pattern.pattern[len(lead):]
+    if rest[:1] in ('*', '?', '{'):
+        lead = lead[:-1]
+    return lead
@@ -1,4 +1,5 @@
 from collections import namedtuple
+import os
 from multiprocessing import cpu_count
 
 from .util import try_import
@@ -32,11 +33,13 @@ BackendInfo = namedtuple('BackendInfo', 'version,extra_info')
 class ServerBackend(object):
     vulnerable = True
 
-    def __init__(self, processes=None):
+    def __init__(self, processes=None, threads=1):
         if not hasattr(self, 'processes'):
             if processes is None:
                 processes = _get_cpu_count()
             self.processes = processes
+        if not hasattr(self, 'threads'):
+            self.threads = threads
 
     @classmethod
     def get_info(cls):
@@ -62,8 +65,12 @@ class ServerBackend(object):
 class WerkzeugBackend(ServerBackend):
     threaded = False
     mod_name = 'werkzeug'
+    # the threaded variant starts a thread per request, without a limit
+    threads = 1
 
     def run_server(self, app, host, port):
+        # Flask >= 2.2 ignores app.run() inside of CLI commands
+        os.environ.pop('FLASK_RUN_FROM_CLI', None)
         app.run(host,
                 port,
                 debug=False,
@@ -81,6 +88,7 @@ class WerkzeugThreaded(WerkzeugBackend):
 @backend('tornado')
 class TornadoBackend(ServerBackend):
     mod_name = 'tornado'
+    threads = 1
 
     def run_server(self, app, host, port):
         from tornado.wsgi import WSGIContainer
@@ -102,7 +110,8 @@ class GUnicornBackend(ServerBackend):
         class FlaskGUnicornApp(gunicorn.app.base.BaseApplication):
             options = {
                 'bind': '{}:{}'.format(host, port),
-                'workers': self.processes
+                'workers': self.processes,
+                'threads': self.threads,
             }
 
             def load_config(self):
@@ -118,6 +127,7 @@ class GUnicornBackend(ServerBackend):
 @backend('meinheld')
 class MeinHeldBackend(ServerBackend):
     mod_name = 'meinheld'
+    threads = 1
 
     def run_server(self, app, host, port):
         from meinheld import server
@@ -6,3 +6,8 @@ db_before_reset = signals.signal('db-before-reset')
 db_reset_dropped = signals.signal('db-reset-dropped')
 db_reset_created = signals.signal('db-reset-created')
 db_after_reset = signals.signal('db-after-reset')
+db_reset_restored = signals.signal('db-reset-restored')
+db_before_load = signals.signal('db-before-load')
+db_batch_loaded = signals.signal('db-batch-loaded')
+db_after_load = signals.signal('db-after-load')
+config_dir_reloaded = signals.signal('config-dir-reloaded')
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import sqlite3
+
+snapshot_backends = {}
+
+
+def snapshot_backend(dialect):
+    def _(cls):
+        snapshot_backends[dialect] = cls
+        cls.dialect = dialect
+        return cls
+
+    return _
+
+
+def metadata_hash(metadata, dialect):
+    """Calculate a hash over the DDL of all tables and indexes in
+    ``metadata``. Any change to the models results in a different hash.
+
+    :param metadata: A :class:`sqlalchemy.MetaData` instance.
+    :param dialect: The dialect used to compile the DDL statements.
+    """
+    from sqlalchemy.schema import CreateIndex, CreateTable
+
+    h = hashlib.sha1()
+    for table in metadata.sorted_tables:
+        h.update(str(CreateTable(table).compile(dialect=dialect)).encode(
+            'utf8'))
+        for index in sorted(table.indexes, key=lambda i: i.name or ''):
+            h.update(str(CreateIndex(index).compile(dialect=dialect)).encode(
+                'utf8'))
+    return h.hexdigest()[:12]
+
+
+def get_snapshot(engine, key):
+    """Return a snapshot for the database of ``engine``.
+
+    :param engine: The SQLAlchemy engine of the database.
+    :param key: A key identifying the snapshot, usually the result of
+                :func:`metadata_hash`. Snapshots with a different key are
+                considered stale.
+    """
+    try:
+        cls = snapshot_backends[engine.dialect.name]
+    except KeyError:
+        raise RuntimeError('Snapshots are not supported for {} databases'
+                           .format(engine.dialect.name))
+    return cls(engine, key)
+
+
+class Snapshot(object):
+    def __init__(self, engine, key):
+        self.engine = engine
+        self.key = key
+
+    def exists(self):
+        """Check whether a snapshot for the current key has been captured.
+        """
+        raise NotImplementedError
+
+    def capture(self):
+        """Capture the current state of the database, replacing stale
+        snapshots."""
+        raise NotImplementedError
+
+    def restore(self):
+        """Restore the database from the snapshot."""
+        raise NotImplementedError
+
+
+@snapshot_backend('sqlite')
+class SQLiteSnapshot(Snapshot):
+    def __init__(self, engine, key):
+        super(SQLiteSnapshot, self).__init__(engine, key)
+
+        database = engine.url.database
+        if not database or database == ':memory:':
+            raise RuntimeError('Cannot snapshot in-memory SQLite databases')
+        self.db_path = os.path.abspath(database)
+        self.prefix = self.db_path + '.snapshot-'
+        self.path = self.prefix + key
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _copy(self, src, dest):
+        # the backup api copies a consistent state of the database, including
+        # pages that are still in the write-ahead log of a WAL mode database,
+        # and replaces the destination through its regular journal
+        src_con = sqlite3.connect(src)
+        try:
+            dest_con = sqlite3.connect(dest)
+            try:
+                src_con.backup(dest_con)
+            finally:
+                dest_con.close()
+        finally:
+            src_con.close()
+
+    def capture(self):
+        self.engine.dispose()
+
+        # remove stale snapshots, including their -wal and -shm files
+        dirname = os.path.dirname(self.db_path)
+        for fn in os.listdir(dirname):
+            path = os.path.join(dirname, fn)
+            if path.startswith(self.prefix) and path != self.path:
+                os.unlink(path)
+
+        tmp_path = self.path + '.tmp'
+        self._copy(self.db_path, tmp_path)
+        os.rename(tmp_path, self.path)
+
+    def restore(self):
+        self.engine.dispose()
+        self._copy(self.path, self.db_path)
+
+    def __str__(self):
+        return self.path
+
+
+@snapshot_backend('postgresql')
+class PostgresSnapshot(Snapshot):
+    # postgres can copy an entire database in a single statement by using it
+    # as a template for a new one
+    def __init__(self, engine, key):
+        super(PostgresSnapshot, self).__init__(engine, key)
+
+        self.db_name = engine.url.database
+        self.prefix = self.db_name + '_snapshot_'
+        self.name = self.prefix + key
+
+    def _execute(self, *statements):
+        # statements are strings or (statement, parameters) tuples
+        from sqlalchemy import create_engine, text
+
+        # connect to the maintenance database, the database that is copied
+        # must not have any open connections
+        self.engine.dispose()
+        maint = create_engine(self.engine.url.set(database='postgres'),
+                              isolation_level='AUTOCOMMIT')
+        try:
+            rows = []
+            with maint.connect() as con:
+                for stmt in statements:
+                    if not isinstance(stmt, tuple):
+                        stmt = (stmt, {})
+                    res = con.execute(text(stmt[0]), stmt[1])
+                    rows.append(res.fetchall() if res.returns_rows else None)
+            return rows
+        finally:
+            maint.dispose()
+
+    def _quote(self, name):
+        return self.engine.dialect.identifier_preparer.quote(name)
+
+    def _snapshot_names(self):
+        pattern = self.prefix
+        for c in ('\\', '%', '_'):
+            pattern = pattern.replace(c, '\\' + c)
+
+        res, = self._execute(('SELECT datname FROM pg_database '
+                              'WHERE datname LIKE :pattern',
+                              {'pattern': pattern + '%'}))
+        return [row[0] for row in res]
+
+    def exists(self):
+        return self.name in self._snapshot_names()
+
+    def capture(self):
+        stmts = ['DROP DATABASE {}'.format(self._quote(name))
+                 for name in self._snapshot_names()]
+        stmts.append('CREATE DATABASE {} TEMPLATE {}'.format(
+            self._quote(self.name), self._quote(self.db_name)))
+        self._execute(*stmts)
+
+    def restore(self):
+        self._execute('DROP DATABASE {}'.format(self._quote(self.db_name)),
+                      'CREATE DATABASE {} TEMPLATE {}'.format(
+                          self._quote(self.db_name), self._quote(self.name)))
+
+    def __str__(self):
+        return self.name
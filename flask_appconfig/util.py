@@ -1,5 +1,15 @@
 from importlib import import_module
 
+from six.moves.urllib_parse import urlparse
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # python 2
+    from collections import Mapping
+
+# parsed urls, see ``parse_url``
+_parsed_urls = {}
+
 
 def try_import(*module_names):
     for module_name in module_names:
@@ -13,3 +23,56 @@ def try_import_obj(module_name, name):
     mod = try_import(module_name)
     if mod:
         return getattr(mod, name, None)
+
+
+def parse_url(url):
+    """Like ``urlparse``, but memoized. Results are immutable and can be
+    shared safely."""
+    try:
+        return _parsed_urls[url]
+    except KeyError:
+        rv = _parsed_urls[url] = urlparse(url)
+        return rv
+
+
+class FrozenDict(Mapping):
+    """A read-only dictionary."""
+
+    def __init__(self, *args, **kwargs):
+        self._data = dict(*args, **kwargs)
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self._data)
+
+
+def freeze(value):
+    """Return a deep, immutable copy of ``value``, which can be shared
+    safely. Lists become tuples, sets frozensets and dictionaries
+    ``FrozenDict`` instances."""
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def thaw(value):
+    """Return a deep, mutable copy of a value created by :func:`freeze`."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    if isinstance(value, frozenset):
+        return set(value)
+    return value
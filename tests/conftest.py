@@ -0,0 +1,91 @@
+import json
+import os
+import timeit
+
+import pytest
+
+BASELINES = os.path.join(os.path.dirname(__file__), 'benchmarks.json')
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption('--benchmark',
+                    action='store_true',
+                    help='Run benchmarks and compare them to the baselines')
+    group.addoption('--benchmark-update',
+                    action='store_true',
+                    help='Run benchmarks and store results as new baselines')
+    group.addoption('--benchmark-threshold',
+                    type=float,
+                    default=0.5,
+                    help='Fail benchmarks that are slower than their '
+                    'baseline by more than this fraction. Default: 0.5')
+
+
+def _calibrate():
+    # a fixed pure-python workload, results are stored relative to its
+    # duration to make baselines comparable across machines
+    def workload():
+        d = {}
+        for i in range(1000):
+            d['KEY_{}'.format(i)] = str(i).upper()
+        return sorted(d)
+
+    return min(timeit.repeat(workload, number=20, repeat=5)) / 20
+
+
+@pytest.fixture(scope='session')
+def baselines(request):
+    update = request.config.getoption('--benchmark-update')
+
+    if os.path.exists(BASELINES):
+        with open(BASELINES) as f:
+            data = json.load(f)
+    else:
+        data = {}
+
+    yield data
+
+    if update:
+        with open(BASELINES, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+@pytest.fixture(scope='session')
+def calibration():
+    return _calibrate()
+
+
+@pytest.fixture
+def measure(request, baselines, calibration):
+    """Returns a function that times a callable and compares the result to
+    the stored baseline for the current test."""
+    opts = request.config
+    update = opts.getoption('--benchmark-update')
+    if not (update or opts.getoption('--benchmark')):
+        pytest.skip('benchmarks are only run with --benchmark')
+
+    threshold = opts.getoption('--benchmark-threshold')
+    name = request.node.name
+
+    def run(func, number=100, repeat=5):
+        t = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+        rel = t / calibration
+
+        if update:
+            baselines[name] = rel
+            return t
+
+        if name not in baselines:
+            pytest.fail('No baseline for {}, run with --benchmark-update to '
+                        'record one'.format(name))
+
+        limit = baselines[name] * (1 + threshold)
+        if rel > limit:
+            pytest.fail('{} took {:.1f} (baseline {:.1f}, limit {:.1f}) '
+                        'calibration units'.format(name, rel, baselines[name],
+                                                   limit))
+        return t
+
+    return run
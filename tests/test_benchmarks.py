@@ -0,0 +1,182 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+from flask import Flask
+from flask_appconfig import AppConfig, DockerConfig, HerokuConfig, env
+from flask_appconfig import fileconfig
+from flask_appconfig.middleware import ReverseProxied
+from flask_appconfig.providers import providers, scan_environ
+
+
+def create_app(cls=AppConfig, **kwargs):
+    app = Flask('benchapp')
+    cls(app, enable_cli=False, **kwargs)
+    return app
+
+
+@pytest.fixture
+def huge_env(monkeypatch):
+    # similar to the service link variables found in kubernetes pods
+    for i in range(10000):
+        monkeypatch.setenv('SERVICE_{}_PORT'.format(i), 'tcp://10.0.0.1:80')
+
+
+@pytest.fixture
+def heroku_env(monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', 'postgres://user:pw@dbhost:5432/db')
+    monkeypatch.setenv('REDISTOGO_URL', 'redis://:pw@redishost:6379')
+    monkeypatch.setenv('MONGOLAB_URI', 'mongodb://user:pw@mongohost:27017/db')
+    monkeypatch.setenv('MAILGUN_SMTP_SERVER', 'smtp.mailgun.org')
+    monkeypatch.setenv('MAILGUN_SMTP_PORT', '587')
+    monkeypatch.setenv('MAILGUN_SMTP_LOGIN', 'login')
+    monkeypatch.setenv('MAILGUN_SMTP_PASSWORD', 'secret')
+
+
+@pytest.fixture
+def docker_env(monkeypatch):
+    monkeypatch.setenv('PG_PORT', 'tcp://172.17.0.5:5432')
+    monkeypatch.setenv('REDIS_PORT', 'tcp://172.17.0.6:6379')
+
+
+def test_init_app_small_env(measure, monkeypatch):
+    monkeypatch.setenv('BENCHAPP_SETTING', '"value"')
+    measure(create_app)
+
+
+def test_init_app_huge_env(measure, huge_env):
+    measure(create_app, number=10)
+
+
+def write_config_file(tmpdir, ext, n):
+    data = {'SETTING_{}'.format(i): 'value {}'.format(i) for i in range(n)}
+    fn = tmpdir.join('config.' + ext)
+
+    if ext == 'py':
+        fn.write(''.join('{} = {!r}\n'.format(k, v) for k, v in data.items()))
+    elif ext == 'json':
+        fn.write(json.dumps(data))
+    elif ext == 'toml':
+        fn.write(''.join('{} = {}\n'.format(k, json.dumps(v))
+                         for k, v in data.items()))
+    elif ext == 'yaml':
+        fn.write(pytest.importorskip('yaml').safe_dump(data))
+    return fn
+
+
+@pytest.mark.parametrize('ext', ['py', 'json', 'toml', 'yaml'])
+@pytest.mark.parametrize('cached', [True, False],
+                         ids=['cached', 'uncached'])
+def test_init_app_config_file(measure, monkeypatch, tmpdir, ext, cached):
+    if ext == 'py' and cached:
+        pytest.skip('python configuration files are not cached')
+    if ext == 'toml':
+        pytest.importorskip('tomllib')
+
+    fn = write_config_file(tmpdir, ext, 5000)
+    monkeypatch.setenv('BENCHAPP_CONFIG', str(fn))
+
+    def init_app():
+        if not cached:
+            fileconfig._cache.clear()
+        create_app()
+
+    measure(init_app, number=5)
+
+
+def test_scan_environ_huge_env(measure, heroku_env, docker_env, huge_env):
+    provs = [providers['heroku'], providers['docker']]
+
+    def load():
+        config = {}
+        scan = scan_environ(provs, 'BENCHAPP_')
+        env.from_envvars(config, 'BENCHAPP_', environ=scan.prefixed)
+        for prov in provs:
+            prov.func(config, scan.matched[prov.name])
+
+    measure(load, number=10)
+
+
+def test_heroku_config(measure, heroku_env):
+    measure(lambda: create_app(HerokuConfig))
+
+
+def test_heroku_config_huge_env(measure, heroku_env, huge_env):
+    measure(lambda: create_app(HerokuConfig), number=10)
+
+
+def test_docker_config(measure, docker_env):
+    measure(lambda: create_app(DockerConfig))
+
+
+def test_reverse_proxied_call(measure):
+    def app(environ, start_response):
+        return environ
+
+    wsgi_app = ReverseProxied(app)
+
+    def request():
+        wsgi_app({'HTTP_X_SCRIPT_NAME': '/prefix',
+                  'HTTP_X_SCHEME': 'https',
+                  'PATH_INFO': '/prefix/index',
+                  'wsgi.url_scheme': 'http'}, None)
+
+    measure(request, number=10000)
+
+
+def _free_port():
+    s = socket.socket()
+    try:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+    finally:
+        s.close()
+
+
+def _wait_for_port(port, proc, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError('flask serve exited with {}'.format(
+                proc.returncode))
+        try:
+            socket.create_connection(('127.0.0.1', port), 0.1).close()
+            return
+        except socket.error:
+            time.sleep(0.005)
+    raise RuntimeError('flask serve did not start within {} seconds'.format(
+        timeout))
+
+
+def test_serve_startup(measure, tmpdir):
+    # time from starting ``flask serve`` until the backend accepts
+    # connections, including interpreter startup and imports
+    tmpdir.join('benchapp.py').write(
+        'from flask import Flask\n'
+        'from flask_appconfig import AppConfig\n'
+        'app = Flask(__name__)\n'
+        'AppConfig(app)\n')
+
+    environ = dict(os.environ, FLASK_APP='benchapp')
+    environ['PYTHONPATH'] = os.pathsep.join(
+        [str(tmpdir)] + [p for p in [environ.get('PYTHONPATH')] if p])
+
+    def serve():
+        port = _free_port()
+        proc = subprocess.Popen(
+            [sys.executable, '-m', 'flask', 'serve', '-b', 'werkzeug', '-w',
+             '1', '-p', str(port)],
+            env=environ,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL)
+        try:
+            _wait_for_port(port, proc)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    measure(serve, number=1, repeat=5)
@@ -0,0 +1,165 @@
+import datetime
+import decimal
+import json
+
+import pytest
+
+pytest.importorskip('flask_sqlalchemy')
+
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from flask_appconfig import AppConfig
+from flask_appconfig.signals import db_batch_loaded
+
+
+def create_sample_app(db_path):
+    app = Flask('testapp')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///{}'.format(db_path)
+    AppConfig(app)
+
+    db = SQLAlchemy(app)
+
+    class Author(db.Model):
+        __tablename__ = 'author'
+        id = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(20))
+
+    class Book(db.Model):
+        __tablename__ = 'book'
+        id = db.Column(db.Integer, primary_key=True)
+        author_id = db.Column(db.Integer, db.ForeignKey('author.id'))
+        available = db.Column(db.Boolean)
+        published = db.Column(db.Date)
+        added = db.Column(db.DateTime)
+        price = db.Column(db.Numeric(8, 2))
+
+    with app.app_context():
+        db.create_all()
+
+    return app, db, Author, Book
+
+
+def test_load(tmpdir):
+    app, db, Author, Book = create_sample_app(str(tmpdir.join('test.db')))
+
+    books = tmpdir.join('book.csv')
+    books.write('id,author_id,available\n' + ''.join(
+        '{},{},{}\n'.format(i, i % 3 + 1, 'true' if i % 2 else 'false')
+        for i in range(1, 11)))
+
+    authors = tmpdir.join('author.jsonl')
+    authors.write('\n'.join(json.dumps({'id': i, 'name': 'author{}'.format(
+        i)}) for i in range(1, 4)))
+
+    batches = []
+    db_batch_loaded.connect(
+        lambda app, table, rows, **kw: batches.append((table.name, rows)),
+        app,
+        weak=False)
+
+    # foreign keys require authors to be loaded first
+    res = app.test_cli_runner().invoke(
+        args=['db', 'load', '-n', '4', str(books), str(authors)])
+    assert res.exit_code == 0, res.output
+    assert batches == [('author', 3), ('book', 4), ('book', 4), ('book', 2)]
+
+    with app.app_context():
+        assert Author.query.count() == 3
+        assert Book.query.filter_by(available=True).count() == 5
+        assert Book.query.filter_by(id=4).one().author_id == 2
+
+
+def test_load_unknown_table(tmpdir):
+    app, _, _, _ = create_sample_app(str(tmpdir.join('test.db')))
+
+    fixture = tmpdir.join('unknown.csv')
+    fixture.write('id\n1\n')
+
+    res = app.test_cli_runner().invoke(args=['db', 'load', str(fixture)])
+    assert res.exit_code == 1
+
+
+def test_load_converts_and_normalizes(tmpdir):
+    app, db, Author, Book = create_sample_app(str(tmpdir.join('test.db')))
+
+    # the second author has no name, which must not drop the column for the
+    # whole batch
+    authors = tmpdir.join('author.json')
+    authors.write(json.dumps([{'id': 1}, {'id': 2, 'name': 'author2'},
+                              {'id': 3}]))
+
+    books = tmpdir.join('book.csv')
+    books.write('id,author_id,published,added,price\n'
+                '1,2,2015-03-01,2015-03-01T12:30:00,19.99\n'
+                '2,1,,,\n')
+
+    res = app.test_cli_runner().invoke(
+        args=['db', 'load', str(books), str(authors)])
+    assert res.exit_code == 0, res.output
+
+    with app.app_context():
+        assert [a.name for a in Author.query.order_by(Author.id)] == [
+            None, 'author2', None
+        ]
+
+        book = Book.query.filter_by(id=1).one()
+        assert book.published == datetime.date(2015, 3, 1)
+        assert book.added == datetime.datetime(2015, 3, 1, 12, 30)
+        assert book.price == decimal.Decimal('19.99')
+        assert Book.query.filter_by(id=2).one().published is None
+
+
+def test_load_json_lines_converts(tmpdir):
+    app, db, _, Book = create_sample_app(str(tmpdir.join('test.db')))
+
+    books = tmpdir.join('book.jsonl')
+    books.write('\n'.join(json.dumps(row) for row in [
+        {'id': 1, 'published': '2015-01-01', 'price': '9.50',
+         'available': 'yes'},
+        {'id': 2, 'added': '2015-01-01T08:00:00', 'price': 12.5,
+         'available': False},
+    ]))
+
+    res = app.test_cli_runner().invoke(args=['db', 'load', str(books)])
+    assert res.exit_code == 0, res.output
+
+    with app.app_context():
+        book = Book.query.filter_by(id=1).one()
+        assert book.published == datetime.date(2015, 1, 1)
+        assert book.price == decimal.Decimal('9.50')
+        assert book.available is True
+
+        book = Book.query.filter_by(id=2).one()
+        assert book.added == datetime.datetime(2015, 1, 1, 8)
+        assert book.price == decimal.Decimal('12.50')
+        assert book.available is False
+
+
+def test_load_json_lines_missing_keys(tmpdir):
+    app, db, Author, _ = create_sample_app(str(tmpdir.join('test.db')))
+
+    authors = tmpdir.join('author.jsonl')
+    authors.write('{"id": 1}\n{"id": 2, "name": "author2"}\n')
+
+    res = app.test_cli_runner().invoke(
+        args=['db', 'load', '-n', '2', str(authors)])
+    assert res.exit_code == 0, res.output
+
+    with app.app_context():
+        assert Author.query.filter_by(id=2).one().name == 'author2'
+
+
+def test_load_invalid(tmpdir):
+    app, _, _, _ = create_sample_app(str(tmpdir.join('test.db')))
+
+    authors = tmpdir.join('author.json')
+    authors.write('{"id": 1}')
+    runner = app.test_cli_runner()
+
+    assert runner.invoke(args=['db', 'load', str(authors)]).exit_code == 1
+
+    books = tmpdir.join('book.csv')
+    books.write('id,available\n1,maybe\n')
+    assert runner.invoke(args=['db', 'load', str(books)]).exit_code == 1
+    assert runner.invoke(
+        args=['db', 'load', '-n', '0', str(authors)]).exit_code == 2
@@ -0,0 +1,109 @@
+import sqlite3
+
+import pytest
+
+pytest.importorskip('flask_sqlalchemy')
+
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from flask_appconfig import AppConfig
+from flask_appconfig.signals import db_reset_created, db_reset_restored
+
+
+def create_sample_app(db_path, extra_column=False):
+    app = Flask('testapp')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///{}'.format(db_path)
+    AppConfig(app)
+
+    db = SQLAlchemy(app)
+
+    class Item(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(20))
+
+        if extra_column:
+            extra = db.Column(db.Integer)
+
+    def seed(app, db, con):
+        db.session.add(Item(name='seeded'))
+        db.session.commit()
+
+    db_reset_created.connect(seed, app, weak=False)
+
+    return app, db, Item
+
+
+def reset(app, *args):
+    res = app.test_cli_runner().invoke(args=['db', 'reset'] + list(args))
+    assert res.exit_code == 0, res.output
+    return res
+
+
+def test_reset_snapshot(tmpdir):
+    db_path = tmpdir.join('test.db')
+    app, db, Item = create_sample_app(str(db_path))
+
+    restored = []
+    db_reset_restored.connect(lambda app, **kw: restored.append(app), app,
+                              weak=False)
+
+    reset(app, '--snapshot')
+    snapshots = tmpdir.listdir(lambda p: '.snapshot-' in p.basename)
+    assert len(snapshots) == 1
+    assert not restored
+
+    with app.app_context():
+        db.session.add(Item(name='added'))
+        db.session.commit()
+
+    reset(app, '--snapshot')
+    assert restored == [app]
+
+    with app.app_context():
+        assert [i.name for i in Item.query.all()] == ['seeded']
+
+
+def test_reset_snapshot_invalidated(tmpdir):
+    db_path = str(tmpdir.join('test.db'))
+
+    app, _, _ = create_sample_app(db_path)
+    reset(app, '--snapshot')
+    old, = tmpdir.listdir(lambda p: '.snapshot-' in p.basename)
+
+    app, _, _ = create_sample_app(db_path, extra_column=True)
+    reset(app, '--snapshot')
+    new, = tmpdir.listdir(lambda p: '.snapshot-' in p.basename)
+
+    assert old != new
+
+
+def test_reset_snapshot_in_memory():
+    app, _, _ = create_sample_app('')
+    res = app.test_cli_runner().invoke(args=['db', 'reset', '--snapshot'])
+    assert res.exit_code == 1
+
+
+def test_reset_snapshot_wal(tmpdir):
+    db_path = str(tmpdir.join('test.db'))
+    app, db, Item = create_sample_app(db_path)
+
+    # keeping a connection open prevents sqlite from checkpointing the
+    # write-ahead log when the engine is disposed
+    con = sqlite3.connect(db_path)
+    con.execute('PRAGMA journal_mode=WAL')
+    con.execute('CREATE TABLE unrelated (id INTEGER)')
+    con.commit()
+
+    try:
+        reset(app, '--snapshot')
+
+        with app.app_context():
+            db.session.add(Item(name='added'))
+            db.session.commit()
+
+        reset(app, '--snapshot')
+
+        with app.app_context():
+            assert [i.name for i in Item.query.all()] == ['seeded']
+    finally:
+        con.close()
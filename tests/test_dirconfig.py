@@ -0,0 +1,123 @@
+import os
+import threading
+
+from flask import Flask
+from flask_appconfig import AppConfig
+from flask_appconfig.dirconfig import read_config_dir
+from flask_appconfig.signals import config_dir_reloaded
+
+
+def make_k8s_volume(tmpdir, version, values):
+    # kubernetes mounts ConfigMaps as symlinks to a ..data symlink, which is
+    # swapped atomically on updates
+    data_dir = tmpdir.mkdir('..{}'.format(version))
+    for k, v in values.items():
+        data_dir.join(k).write(v + '\n')
+
+    tmp_link = str(tmpdir.join('..data_tmp'))
+    os.symlink(data_dir.basename, tmp_link)
+    os.rename(tmp_link, str(tmpdir.join('..data')))
+
+    for k in values:
+        link = tmpdir.join(k)
+        if not link.check(link=1):
+            os.symlink(os.path.join('..data', k), str(link))
+
+
+def test_read_config_dir(tmpdir):
+    tmpdir.join('db-password').write('secret\n')
+    tmpdir.join('port').write('80')
+    tmpdir.join('.hidden').write('x')
+    tmpdir.mkdir('subdir')
+
+    assert read_config_dir(str(tmpdir)) == {'DB_PASSWORD': 'secret',
+                                            'PORT': '80'}
+    assert read_config_dir(str(tmpdir), as_json=True,
+                           concurrent=True)['PORT'] == 80
+
+
+def test_read_empty_config_dir(tmpdir):
+    assert read_config_dir(str(tmpdir), concurrent=True) == {}
+    assert read_config_dir(str(tmpdir)) == {}
+
+
+def test_watch_config_dir(tmpdir):
+    make_k8s_volume(tmpdir, 1, {'key-a': 'a1', 'key-b': 'b1'})
+
+    app = Flask('testapp')
+    AppConfig(app, config_dirs=[str(tmpdir)], watch_config_dirs=60)
+    assert app.config['KEY_A'] == 'a1'
+
+    reloads = []
+    config_dir_reloaded.connect(
+        lambda app, path, changed, removed: reloads.append((changed, removed)),
+        app,
+        weak=False)
+
+    watcher = app.extensions['appconfig_dir_watcher']
+    watcher.check()
+    assert reloads == []
+
+    make_k8s_volume(tmpdir, 2, {'key-a': 'a2', 'key-b': 'b1'})
+    watcher.check()
+    assert reloads == [({'KEY_A': 'a2'}, set())]
+    assert app.config['KEY_A'] == 'a2'
+
+    tmpdir.join('key-b').remove()
+    watcher.check()
+    assert reloads[-1] == ({}, {'KEY_B'})
+    assert 'KEY_B' not in app.config
+
+
+def test_watch_frozen_config(tmpdir):
+    make_k8s_volume(tmpdir, 1, {'key-a': 'a1'})
+
+    app = Flask('testapp')
+    AppConfig(app, config_dirs=[str(tmpdir)], watch_config_dirs=60,
+              freeze='attrs')
+    app.test_client().get('/')
+
+    make_k8s_volume(tmpdir, 2, {'key-a': 'a2', 'key-b': 'b2'})
+    app.extensions['appconfig_dir_watcher'].check()
+    assert app.config.KEY_A == 'a2'
+
+    tmpdir.join('key-a').remove()
+    app.extensions['appconfig_dir_watcher'].check()
+    assert 'KEY_A' not in app.config
+    assert app.config.KEY_B == 'b2'
+
+
+def test_read_binary_file(tmpdir):
+    tmpdir.join('keystore').write_binary(b'\xff\xfe\n')
+    tmpdir.join('name').write('text\n')
+
+    assert read_config_dir(str(tmpdir), as_json=True) == {
+        'KEYSTORE': b'\xff\xfe\n',
+        'NAME': 'text'
+    }
+
+
+def test_watcher_started_once(tmpdir, monkeypatch):
+    tmpdir.join('key-a').write('a')
+    app = Flask('testapp')
+    AppConfig(app, config_dirs=[str(tmpdir)], watch_config_dirs=60)
+    watcher = app.extensions['appconfig_dir_watcher']
+
+    started = []
+
+    class Thread(object):
+        def __init__(self, target):
+            pass
+
+        def start(self):
+            started.append(1)
+
+    threads = [threading.Thread(target=watcher._ensure_started)
+               for _ in range(8)]
+    monkeypatch.setattr('flask_appconfig.dirconfig.threading.Thread', Thread)
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    watcher._ensure_started()
+    assert started == [1]
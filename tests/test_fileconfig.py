@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from flask import Flask
+from flask_appconfig import AppConfig
+from flask_appconfig import fileconfig
+
+
+def create_sample_app():
+    app = Flask('testapp')
+    AppConfig(app)
+    return app
+
+
+@pytest.mark.parametrize('ext,content', [
+    ('json', '{"CONFA": "a", "CONFB": [1, 2], "lower": 1}'),
+    ('toml', 'CONFA = "a"\nCONFB = [1, 2]\nlower = 1\n'),
+    ('yaml', 'CONFA: a\nCONFB: [1, 2]\nlower: 1\n'),
+])
+def test_config_file(monkeypatch, tmpdir, ext, content):
+    if ext == 'toml':
+        pytest.importorskip('tomllib')
+    if ext == 'yaml':
+        pytest.importorskip('yaml')
+
+    fn = tmpdir.join('config.' + ext)
+    fn.write(content)
+    monkeypatch.setenv('TESTAPP_CONFIG', str(fn))
+
+    app = create_sample_app()
+    assert app.config['CONFA'] == 'a'
+    assert app.config['CONFB'] == [1, 2]
+    assert 'lower' not in app.config
+
+
+def test_python_config_file(monkeypatch, tmpdir):
+    fn = tmpdir.join('config.py')
+    fn.write('CONFA = "a" * 2\n')
+    monkeypatch.setenv('TESTAPP_CONFIG', str(fn))
+
+    app = create_sample_app()
+    assert app.config['CONFA'] == 'aa'
+
+
+def test_config_file_cache(tmpdir):
+    fn = tmpdir.join('config.json')
+    fn.write(json.dumps({'CONFA': 'a'}))
+
+    items = fileconfig.parse_config_file(str(fn))
+    assert fileconfig.parse_config_file(str(fn)) is items
+
+    fn.write(json.dumps({'CONFA': 'changed'}))
+    assert fileconfig.parse_config_file(str(fn)) == (('CONFA', 'changed'), )
+
+
+def test_config_file_values_not_shared(monkeypatch, tmpdir):
+    fn = tmpdir.join('config.json')
+    fn.write(json.dumps({'CONFA': [1], 'CONFB': {'a': [1]}}))
+    monkeypatch.setenv('TESTAPP_CONFIG', str(fn))
+
+    app = create_sample_app()
+    app.config['CONFA'].append(2)
+    app.config['CONFB']['a'].append(2)
+
+    other = create_sample_app()
+    assert other.config['CONFA'] == [1]
+    assert other.config['CONFB'] == {'a': [1]}
+
+
+def test_config_file_non_string_keys(tmpdir):
+    pytest.importorskip('yaml')
+
+    fn = tmpdir.join('config.yaml')
+    fn.write('CONFA: a\n1: b\ntrue: c\n')
+    assert fileconfig.parse_config_file(str(fn)) == (('CONFA', 'a'), )
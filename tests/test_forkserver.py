@@ -0,0 +1,83 @@
+import json
+import os
+import sys
+import types
+
+import pytest
+
+from flask_appconfig.forkserver import is_project_module, restart_latency
+
+
+def test_library_modules_are_not_project_modules():
+    assert not is_project_module(json)
+    assert not is_project_module(sys)
+
+
+def test_user_site_modules_are_not_project_modules(monkeypatch, tmpdir):
+    user_site = tmpdir.mkdir('user-site')
+    monkeypatch.setattr('site.getusersitepackages', lambda: str(user_site))
+
+    module = types.ModuleType('userpkg')
+    module.__file__ = str(user_site.join('userpkg.py'))
+    assert not is_project_module(module)
+
+
+def test_test_modules_are_project_modules():
+    import module
+    assert is_project_module(module)
+
+
+def test_restart_latency_outside_reloader(monkeypatch):
+    monkeypatch.delenv('WERKZEUG_RUN_MAIN', raising=False)
+    assert restart_latency() is None
+
+
+def test_restart_latency(monkeypatch):
+    monkeypatch.setenv('WERKZEUG_RUN_MAIN', 'true')
+    monkeypatch.setenv('FLASK_APPCONFIG_RESTART_TIME', '0')
+    assert restart_latency() > 0
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork')
+def test_restart_with_fork(monkeypatch, tmpdir):
+    from flask_appconfig import forkserver
+
+    counter = tmpdir.join('runs')
+    counter.write('')
+
+    def run_child():
+        # runs in the forked child: exit code 3 requests another restart
+        os.environ['WERKZEUG_RUN_MAIN'] = 'true'
+        counter.write('x', mode='a')
+        return 3 if len(counter.read()) < 3 else 7
+
+    monkeypatch.setattr(forkserver, '_run_child', run_child)
+    monkeypatch.delenv('WERKZEUG_RUN_MAIN', raising=False)
+
+    assert forkserver.restart_with_fork(None) == 7
+    assert counter.read() == 'xxx'
+    assert 'WERKZEUG_RUN_MAIN' not in os.environ
+
+
+def test_main_target_module(monkeypatch):
+    from flask_appconfig import forkserver
+
+    class Spec(object):
+        name = 'flask.__main__'
+
+    class Main(object):
+        __spec__ = Spec()
+
+    monkeypatch.setitem(sys.modules, '__main__', Main())
+    assert forkserver._main_target() == ('module', 'flask')
+
+
+def test_main_target_path(monkeypatch):
+    from flask_appconfig import forkserver
+
+    class Main(object):
+        __spec__ = None
+
+    monkeypatch.setitem(sys.modules, '__main__', Main())
+    monkeypatch.setattr(sys, 'argv', ['/usr/bin/flask', 'dev'])
+    assert forkserver._main_target() == ('path', '/usr/bin/flask')
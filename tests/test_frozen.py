@@ -0,0 +1,83 @@
+import copy
+import pickle
+
+import pytest
+from flask import Flask
+from flask_appconfig import AppConfig, HerokuConfig
+from flask_appconfig.frozen import FrozenConfig
+
+
+def create_sample_app(cls=AppConfig, **kwargs):
+    app = Flask('testapp')
+    cls(app, **kwargs)
+
+    @app.route('/')
+    def index():
+        return 'ok'
+
+    return app
+
+
+def test_freeze_on_first_request(monkeypatch):
+    monkeypatch.setenv('TESTAPP_CONFA', 'a')
+
+    app = create_sample_app(freeze=True)
+    app.config['CONFB'] = 'b'
+    assert not isinstance(app.config, FrozenConfig)
+
+    app.test_client().get('/')
+    assert isinstance(app.config, FrozenConfig)
+    assert app.config['CONFA'] == 'a'
+    assert app.config['CONFB'] == 'b'
+
+    with pytest.raises(TypeError):
+        app.config['CONFA'] = 'changed'
+    with pytest.raises(TypeError):
+        app.config.update(CONFA='changed')
+    with pytest.raises(TypeError):
+        del app.config['CONFA']
+    with pytest.raises(TypeError):
+        app.config |= {'CONFA': 'changed'}
+    assert app.config['CONFA'] == 'a'
+
+    # creates a new dictionary
+    assert (app.config | {'CONFA': 'changed'})['CONFA'] == 'changed'
+
+    # unchanged values may be set
+    app.debug = False
+
+
+def test_freeze_attrs(monkeypatch):
+    monkeypatch.setenv('MAILGUN_SMTP_SERVER', 'smtp.mailgun.org')
+    monkeypatch.setenv('MAILGUN_SMTP_PORT', '587')
+    monkeypatch.setenv('MAILGUN_SMTP_LOGIN', 'login')
+    monkeypatch.setenv('MAILGUN_SMTP_PASSWORD', 'secret')
+    monkeypatch.setenv('REDISTOGO_URL', 'redis://:pw@redishost:1234')
+
+    app = create_sample_app(HerokuConfig, freeze='attrs', layered=True)
+    app.test_client().get('/')
+
+    assert app.config.REDIS_HOST == 'redishost'
+    assert app.config.REDIS_PORT == 1234
+    assert app.config.MAIL_PORT == app.config['MAIL_PORT']
+    assert 'REDIS_HOST' not in vars(app.config)
+
+    with pytest.raises(AttributeError):
+        app.config.MISSING
+
+    with pytest.raises(TypeError):
+        app.config.REDIS_HOST = 'otherhost'
+
+
+def test_copy_frozen_config():
+    config = FrozenConfig('/', {'CONFA': 'a', 'CONFB': [1]}, attrs=True)
+
+    for other in (copy.copy(config), copy.deepcopy(config),
+                  pickle.loads(pickle.dumps(config))):
+        assert isinstance(other, FrozenConfig)
+        assert other == config
+        assert other.root_path == '/'
+        assert other.CONFA == 'a'
+
+        with pytest.raises(TypeError):
+            other['CONFA'] = 'changed'
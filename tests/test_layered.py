@@ -0,0 +1,130 @@
+import json
+
+import pytest
+from flask import Flask
+from flask_appconfig import AppConfig, HerokuConfig
+from flask_appconfig.layered import LayeredConfig
+
+
+def create_sample_app(cls=AppConfig):
+    app = Flask('testapp')
+    app.config['CONFA'] = 'initial'
+    cls(app, layered=True)
+    return app
+
+
+def test_layers_shared(monkeypatch, tmpdir):
+    fn = tmpdir.join('config.json')
+    fn.write(json.dumps({'CONFA': 'file', 'CONFB': 'file'}))
+    monkeypatch.setenv('TESTAPP_CONFIG', str(fn))
+    monkeypatch.setenv('TESTAPP_CONFB', 'env')
+
+    app1 = create_sample_app()
+    app2 = create_sample_app()
+
+    assert isinstance(app1.config, LayeredConfig)
+    assert app1.config['CONFA'] == 'file'
+    assert app1.config['CONFB'] == 'env'
+    assert app1.config['DEBUG'] is False
+
+    # only the per-app layer holding values set before AppConfig differs
+    shared1 = [l for l in app1.config.layers if l.shared]
+    shared2 = [l for l in app2.config.layers if l.shared]
+    assert len(shared1) == 3
+    assert all(a is b for a, b in zip(shared1, shared2))
+
+
+def test_overlay(monkeypatch):
+    monkeypatch.setenv('TESTAPP_CONFA', 'env')
+
+    app1 = create_sample_app()
+    app2 = create_sample_app()
+
+    app1.config['CONFA'] = 'overlay'
+    app1.config.update(CONFC='c')
+    del app1.config['SECRET_KEY']
+
+    assert app1.config['CONFA'] == 'overlay'
+    assert app1.config.get('CONFC') == 'c'
+    assert 'SECRET_KEY' not in app1.config
+    assert 'SECRET_KEY' not in app1.config.keys()
+    assert len(app1.config) == len(app2.config)
+
+    assert app2.config['CONFA'] == 'env'
+    assert 'CONFC' not in app2.config
+    assert 'SECRET_KEY' in app2.config
+
+    assert app1.config.get_namespace('CONF') == {'a': 'overlay', 'c': 'c'}
+
+
+def test_layered_heroku(monkeypatch):
+    monkeypatch.setenv('REDISTOGO_URL', 'redis://:pw@redishost:1234')
+
+    app1 = create_sample_app(HerokuConfig)
+    app2 = create_sample_app(HerokuConfig)
+
+    assert app1.config['REDIS_HOST'] == 'redishost'
+    assert app1.config['REDIS_PORT'] == 1234
+    assert app1.config.layers[-1] is app2.config.layers[-1]
+
+
+def test_shared_values_immutable(monkeypatch):
+    monkeypatch.setenv('TESTAPP_LST', '[1]')
+    monkeypatch.setenv('TESTAPP_DCT', '{"a": [1]}')
+
+    app1 = create_sample_app()
+    app2 = create_sample_app()
+
+    with pytest.raises(AttributeError):
+        app1.config['LST'].append(2)
+    with pytest.raises(TypeError):
+        app1.config['DCT']['b'] = 2
+
+    app1.config['LST'] += (2, )
+    assert app1.config['LST'] == (1, 2)
+    assert app2.config['LST'] == (1, )
+    assert app2.config['DCT']['a'] == (1, )
+
+
+def test_layered_heroku_app_values():
+    app1 = Flask('testapp')
+    app1.config['REDIS_URL'] = 'redis://redishost:1234'
+    HerokuConfig(app1, layered=True)
+    app2 = create_sample_app(HerokuConfig)
+
+    assert app1.config['REDIS_HOST'] == 'redishost'
+    assert 'REDIS_HOST' not in app2.config
+    assert not app1.config.layers[-1].shared
+
+    # the overlay is visible as well
+    app3 = Flask('testapp')
+    app3.config = LayeredConfig.from_app(app3)
+    app3.config['MAILGUN_SMTP_SERVER'] = 'smtp.example.com'
+    app3.config['MAILGUN_SMTP_PORT'] = 25
+    app3.config['MAILGUN_SMTP_LOGIN'] = 'user'
+    app3.config['MAILGUN_SMTP_PASSWORD'] = 'pw'
+    HerokuConfig(app3, layered=True)
+    assert app3.config['MAIL_SERVER'] == 'smtp.example.com'
+
+
+def test_dict_methods(monkeypatch):
+    monkeypatch.setenv('TESTAPP_CONFA', 'env')
+
+    app = create_sample_app()
+    app.config |= {'CONFB': 'b'}
+    assert app.config['CONFB'] == 'b'
+
+    merged = app.config | {'CONFC': 'c'}
+    assert merged['CONFA'] == 'env'
+    assert merged['CONFC'] == 'c'
+    assert 'CONFC' not in app.config
+
+    keys = set(app.config)
+    while True:
+        try:
+            key, _ = app.config.popitem()
+        except KeyError:
+            break
+        keys.remove(key)
+    assert not keys
+    assert len(app.config) == 0
@@ -0,0 +1,92 @@
+import pytest
+from flask import Flask
+from flask_appconfig import AppConfig
+from flask_appconfig.pool import apply_pool_plan, plan_pools
+
+
+def test_plan_pools():
+    config = {
+        'SQLALCHEMY_DATABASE_URI': 'postgres://localhost/db',
+        'SQLALCHEMY_CONNECTION_BUDGET': 20,
+        'REDIS_URL': 'redis://localhost',
+    }
+
+    plans = plan_pools(config, 4, 2, budgets={'redis': 10})
+    assert [(p.service, p.per_worker, p.size, p.overflow)
+            for p in plans] == [('database', 5, 2, 3), ('redis', 2, 2, 0)]
+
+    apply_pool_plan(config, plans)
+    assert config['SQLALCHEMY_POOL_SIZE'] == 2
+    assert config['SQLALCHEMY_MAX_OVERFLOW'] == 3
+    assert config['SQLALCHEMY_ENGINE_OPTIONS'] == {'pool_size': 2,
+                                                   'max_overflow': 3}
+    assert config['REDIS_MAX_CONNECTIONS'] == 2
+
+
+def test_plan_pools_unconfigured_service():
+    assert plan_pools({'SQLALCHEMY_CONNECTION_BUDGET': 20}, 4) == []
+
+
+def test_plan_pools_budget_too_small():
+    config = {'REDIS_URL': 'redis://localhost', 'REDIS_CONNECTION_BUDGET': 7}
+
+    with pytest.raises(ValueError):
+        plan_pools(config, 4, 2)
+
+
+def test_serve_rejects_budget(monkeypatch):
+    monkeypatch.setenv('TESTAPP_SQLALCHEMY_DATABASE_URI', 'sqlite://')
+    app = Flask('testapp')
+    AppConfig(app)
+
+    res = app.test_cli_runner().invoke(
+        args=['serve', '-b', 'werkzeug', '-w', '4', '--db-budget', '3'])
+    assert res.exit_code == 1
+    assert 'too small' in res.output
+
+
+def test_serve_resizes_engine_pool(monkeypatch, tmpdir):
+    flask_sqlalchemy = pytest.importorskip('flask_sqlalchemy')
+    from flask_appconfig import server_backends
+
+    monkeypatch.setenv('TESTAPP_SQLALCHEMY_DATABASE_URI',
+                       'sqlite:///{}'.format(tmpdir.join('test.db')))
+    app = Flask('testapp')
+    AppConfig(app)
+    db = flask_sqlalchemy.SQLAlchemy(app)
+
+    pools = []
+
+    def run_server(self, wsgi_app, host, port):
+        with app.app_context():
+            pools.append(db.engine.pool)
+            with db.engine.connect() as con:
+                con.exec_driver_sql('SELECT 1')
+
+    monkeypatch.setattr(server_backends.WerkzeugBackend, 'run_server',
+                        run_server)
+
+    res = app.test_cli_runner().invoke(
+        args=['serve', '-b', 'werkzeug', '-w', '2', '--db-budget', '10'])
+    assert res.exit_code == 0, res.output
+
+    pool, = pools
+    assert pool.size() == 1
+    assert pool._max_overflow == 4
+
+
+def test_serve_werkzeug_ignores_threads(monkeypatch):
+    from flask_appconfig import server_backends
+
+    monkeypatch.setenv('TESTAPP_SQLALCHEMY_DATABASE_URI', 'sqlite://')
+    monkeypatch.setattr(server_backends.WerkzeugBackend, 'run_server',
+                        lambda self, app, host, port: None)
+    app = Flask('testapp')
+    AppConfig(app)
+
+    res = app.test_cli_runner().invoke(
+        args=['serve', '-b', 'werkzeug', '-w', '2', '-t', '4', '--db-budget',
+              '10'])
+    assert res.exit_code == 0, res.output
+    assert app.config['SQLALCHEMY_POOL_SIZE'] == 1
+    assert '# threads      : 1' in res.output